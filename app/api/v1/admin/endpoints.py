@@ -0,0 +1,29 @@
+# app/api/v1/admin/endpoints.py
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+from app.api.v1.admin import service
+from app.api.v1.admin.schema import BatchUserRequest
+from app.core.security import require_admin
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+@router.post("/admin/users/lookup")
+async def lookup_users(payload: BatchUserRequest):
+    service.validate_batch(payload)
+    return StreamingResponse(service.run_batch(payload, service.lookup_users), media_type=service.NDJSON_MEDIA_TYPE)
+
+@router.post("/admin/users/verify")
+async def verify_users(payload: BatchUserRequest):
+    service.validate_batch(payload)
+    return StreamingResponse(
+        service.run_batch(payload, service.verify_users, invalidate=True),
+        media_type=service.NDJSON_MEDIA_TYPE,
+    )
+
+@router.post("/admin/users/revoke-sessions")
+async def revoke_user_sessions(payload: BatchUserRequest):
+    service.validate_batch(payload)
+    return StreamingResponse(
+        service.run_batch(payload, service.revoke_user_sessions, invalidate=True),
+        media_type=service.NDJSON_MEDIA_TYPE,
+    )
@@ -0,0 +1,46 @@
+# app/api/v1/admin/repository.py
+from datetime import datetime
+from typing import List
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from app.db.models.user import User
+from app.db.models.refresh_token import RefreshToken
+
+async def get_users_by_emails(db: AsyncSession, emails: List[str]) -> List[User]:
+    result = await db.execute(select(User).where(User.email.in_(emails)))
+    return result.scalars().all()
+
+async def get_users_by_ids(db: AsyncSession, ids: List[int]) -> List[User]:
+    result = await db.execute(select(User).where(User.id.in_(ids)))
+    return result.scalars().all()
+
+async def mark_users_verified(db: AsyncSession, user_ids: List[int]) -> set:
+    """Verify the given users in one statement; returns the ids that changed."""
+    result = await db.execute(
+        update(User)
+        .where(User.id.in_(user_ids), User.is_verified.isnot(True))
+        .values(is_verified=True)
+        .returning(User.id)
+        .execution_options(synchronize_session=False)
+    )
+    return set(result.scalars().all())
+
+async def bump_token_versions(db: AsyncSession, user_ids: List[int]):
+    await db.execute(
+        update(User)
+        .where(User.id.in_(user_ids))
+        .values(token_version=User.token_version + 1)
+        .execution_options(synchronize_session=False)
+    )
+
+async def revoke_refresh_tokens_for_users(db: AsyncSession, user_ids: List[int], now: datetime) -> List[int]:
+    """Revoke every live refresh token of the given users; returns one owner id per revoked token."""
+    result = await db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.user_id.in_(user_ids), RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=now)
+        .returning(RefreshToken.user_id)
+        .execution_options(synchronize_session=False)
+    )
+    return result.scalars().all()
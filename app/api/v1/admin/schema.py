@@ -0,0 +1,8 @@
+# app/api/v1/admin/schema.py
+from typing import List
+from pydantic import BaseModel
+
+class BatchUserRequest(BaseModel):
+    # Either list (or both) may be given; results come back in request order.
+    emails: List[str] = []
+    ids: List[int] = []
@@ -0,0 +1,98 @@
+# app/api/v1/admin/service.py
+import json
+import logging
+from collections import Counter
+from datetime import datetime, timezone
+from typing import AsyncIterator, Awaitable, Callable, List
+from fastapi import HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.api.v1.admin import repository
+from app.api.v1.admin.schema import BatchUserRequest
+from app.core.config import settings
+from app.core.principal_cache import invalidate_user
+from app.db.models.user import User
+from app.db.session import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# Applied to the users found in one chunk; returns result fields by user id.
+BatchOperation = Callable[[AsyncSession, List[User]], Awaitable[dict]]
+
+def validate_batch(payload: BatchUserRequest) -> None:
+    total = len(payload.emails) + len(payload.ids)
+    if total == 0:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No emails or ids given")
+    if total > settings.ADMIN_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {settings.ADMIN_BATCH_MAX_ITEMS} users per request",
+        )
+
+def _chunks(items: list, size: int):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+def _user_summary(user: User) -> dict:
+    return {
+        "id": user.id,
+        "name": user.name,
+        "email": user.email,
+        "is_verified": bool(user.is_verified),
+        "signed_up_via_google": user.signed_up_via_google,
+        "created_at": user.created_at.isoformat() if user.created_at else None,
+    }
+
+async def lookup_users(db: AsyncSession, users: List[User]) -> dict:
+    return {user.id: {"status": "found", "user": _user_summary(user)} for user in users}
+
+async def verify_users(db: AsyncSession, users: List[User]) -> dict:
+    changed = await repository.mark_users_verified(db, [user.id for user in users])
+    return {user.id: {"status": "verified" if user.id in changed else "already_verified"} for user in users}
+
+async def revoke_user_sessions(db: AsyncSession, users: List[User]) -> dict:
+    now = datetime.now(timezone.utc)
+    user_ids = [user.id for user in users]
+    # Bumping token_version invalidates outstanding access tokens as well.
+    await repository.bump_token_versions(db, user_ids)
+    revoked = Counter(await repository.revoke_refresh_tokens_for_users(db, user_ids, now))
+    return {user.id: {"status": "revoked", "refresh_tokens": revoked[user.id]} for user in users}
+
+async def run_batch(payload: BatchUserRequest, operation: BatchOperation, invalidate: bool = False) -> AsyncIterator[bytes]:
+    """Apply ``operation`` chunk by chunk and yield one NDJSON line per requested
+    email or id, in request order, followed by a summary line.
+
+    Each chunk is resolved with one ``IN`` query, updated with one statement and
+    committed on its own, so the connection goes back to the pool between
+    chunks instead of being held while the client reads the stream.
+    """
+    counts = Counter()
+    lookups = (
+        ("email", list(dict.fromkeys(payload.emails)), repository.get_users_by_emails),
+        ("id", list(dict.fromkeys(payload.ids)), repository.get_users_by_ids),
+    )
+    async with AsyncSessionLocal() as db:
+        for field, values, resolve in lookups:
+            for chunk in _chunks(values, settings.ADMIN_BATCH_CHUNK_SIZE):
+                try:
+                    users = await resolve(db, chunk)
+                    results = await operation(db, users) if users else {}
+                    await db.commit()
+                except Exception:
+                    await db.rollback()
+                    logger.exception("Batch %s failed for %d %ss", operation.__name__, len(chunk), field)
+                    lines = [{field: value, "status": "error"} for value in chunk]
+                else:
+                    if invalidate:
+                        for user in users:
+                            invalidate_user(user.email)
+                    found = {getattr(user, field): user for user in users}
+                    lines = [
+                        {field: value, **results[found[value].id]} if value in found
+                        else {field: value, "status": "not_found"}
+                        for value in chunk
+                    ]
+                counts.update(line["status"] for line in lines)
+                yield "".join(json.dumps(line) + "\n" for line in lines).encode()
+    yield (json.dumps({"summary": dict(counts)}) + "\n").encode()
@@ -1,6 +1,6 @@
 # app/api/v1/auth/endpoints.py
-from fastapi import APIRouter, HTTPException, Depends, status, Request
-from fastapi.responses import RedirectResponse
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Depends, status, Request
+from fastapi.responses import RedirectResponse, Response
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
@@ -8,7 +8,6 @@ from datetime import datetime
 
 from app.db.models.user import User
 from app.db.models.otp import OTP
-from app.db.models.blacklisted_token import BlacklistedToken
 from app.db.session import get_async_db
 from app.api.v1.auth.schema import (
     RegisterRequest,
@@ -16,25 +15,32 @@ from app.api.v1.auth.schema import (
     TokenResponse,
     ResendOTPRequest,
     PasswordResetRequest,
-    PasswordResetVerify
+    PasswordResetVerify,
+    RefreshRequest
 )
 from app.core.security import (
-    hash_password,
-    verify_password,
-    create_access_token,
+    hash_password_async,
+    verify_password_async,
+    password_needs_rehash,
     validate_password_strength,
     get_current_user,
+    build_blacklist_entry,
     oauth2_scheme
 )
 from app.core import google_oauth
+from app.core.revocation import revocation_cache
+from app.core.rate_limit import login_rate_limit, otp_verify_rate_limit, otp_send_rate_limit
+from app.core.principal_cache import invalidate_user
 from app.core.google_oauth import get_google_login_url
+from app.core.config import settings
+from app.core.keys import key_ring
 from app.api.v1.auth import service as auth_service
 from app.utils.otp import send_otp
-from app.services.mock_email_service import send_mock_email
+from app.services.email_service import send_otp_email, require_email_capacity
 
 router = APIRouter()
 
-@router.post("/auth/register")
+@router.post("/auth/register", dependencies=[Depends(otp_send_rate_limit), Depends(require_email_capacity)])
 async def register_user(payload: RegisterRequest, db: AsyncSession = Depends(get_async_db)):
     result = await db.execute(select(User).filter_by(email=payload.email))
     if result.scalar_one_or_none():
@@ -45,19 +51,17 @@ async def register_user(payload: RegisterRequest, db: AsyncSession = Depends(get
     user = User(
         name=payload.name,
         email=payload.email,
-        hashed_password=hash_password(payload.password)
+        hashed_password=await hash_password_async(payload.password)
     )
     db.add(user)
     await db.commit()
 
     otp_entry = await send_otp(db, payload.email, purpose="verify_email")
-    db.add(otp_entry)
-    await db.commit()
 
-    send_mock_email(payload.email, otp_entry.otp, purpose="verify_email", name=payload.name)
+    send_otp_email(payload.email, otp_entry.otp, purpose="verify_email", name=payload.name)
     return {"msg": "User registered. Please verify your email."}
 
-@router.post("/auth/resend-verification-otp")
+@router.post("/auth/resend-verification-otp", dependencies=[Depends(otp_send_rate_limit), Depends(require_email_capacity)])
 async def resend_verification_otp(payload: ResendOTPRequest, db: AsyncSession = Depends(get_async_db)):
     result = await db.execute(select(User).filter_by(email=payload.email))
     user = result.scalar_one_or_none()
@@ -67,10 +71,10 @@ async def resend_verification_otp(payload: ResendOTPRequest, db: AsyncSession =
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already verified")
 
     otp_entry = await send_otp(db, payload.email, purpose="verify_email")
-    send_mock_email(payload.email, otp_entry.otp, purpose="verify_email", name=user.name)
+    send_otp_email(payload.email, otp_entry.otp, purpose="verify_email", name=user.name)
     return {"msg": "A new OTP has been sent to your email."}
 
-@router.post("/auth/verify-email")
+@router.post("/auth/verify-email", dependencies=[Depends(otp_verify_rate_limit)])
 async def verify_email(payload: OTPVerifyRequest, db: AsyncSession = Depends(get_async_db)):
     result = await db.execute(
         select(OTP).filter_by(email=payload.email, otp=payload.otp, purpose="verify_email")
@@ -83,14 +87,18 @@ async def verify_email(payload: OTPVerifyRequest, db: AsyncSession = Depends(get
     result = await db.execute(select(User).filter_by(email=payload.email))
     user = result.scalar_one_or_none()
 
-    user.is_verified = True
-    await db.delete(otp_entry)
-    await db.commit()
+    try:
+        user.is_verified = True
+        await db.delete(otp_entry)
+        await db.commit()
+    finally:
+        invalidate_user(user.email)
 
     return {"msg": "Email verified successfully."}
 
-@router.post("/auth/login", response_model=TokenResponse)
+@router.post("/auth/login", response_model=TokenResponse, dependencies=[Depends(login_rate_limit)])
 async def login(
+    background_tasks: BackgroundTasks,
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: AsyncSession = Depends(get_async_db)
 ):
@@ -101,17 +109,25 @@ async def login(
         not user
         or not user.is_verified
         or not user.hashed_password
-        or not verify_password(form_data.password, user.hashed_password)
+        or not await verify_password_async(form_data.password, user.hashed_password)
     ):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials or email not verified"
         )
 
-    token = create_access_token(data={"sub": user.email})
-    return {"access_token": token}
+    if settings.BCRYPT_REHASH_ON_LOGIN and password_needs_rehash(user.hashed_password):
+        background_tasks.add_task(
+            auth_service.rehash_password, user.email, user.hashed_password, form_data.password
+        )
+
+    return await auth_service.issue_tokens(db, user)
+
+@router.post("/auth/refresh", response_model=TokenResponse)
+async def refresh(payload: RefreshRequest, db: AsyncSession = Depends(get_async_db)):
+    return await auth_service.rotate_refresh_token(db, payload.refresh_token)
 
-@router.post("/auth/request-password-reset")
+@router.post("/auth/request-password-reset", dependencies=[Depends(otp_send_rate_limit), Depends(require_email_capacity)])
 async def request_password_reset(payload: PasswordResetRequest, db: AsyncSession = Depends(get_async_db)):
     result = await db.execute(select(User).filter_by(email=payload.email))
     user = result.scalar_one_or_none()
@@ -119,13 +135,11 @@ async def request_password_reset(payload: PasswordResetRequest, db: AsyncSession
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
 
     otp_entry = await send_otp(db, payload.email, purpose="reset_password")
-    db.add(otp_entry)
-    await db.commit()
 
-    send_mock_email(payload.email, otp_entry.otp, purpose="reset_password", name=user.name)
+    send_otp_email(payload.email, otp_entry.otp, purpose="reset_password", name=user.name)
     return {"msg": "OTP sent to your email to reset password."}
 
-@router.post("/auth/reset-password")
+@router.post("/auth/reset-password", dependencies=[Depends(otp_verify_rate_limit)])
 async def reset_password(payload: PasswordResetVerify, db: AsyncSession = Depends(get_async_db)):
     result = await db.execute(
         select(OTP).filter_by(email=payload.email, otp=payload.otp, purpose="reset_password")
@@ -141,10 +155,14 @@ async def reset_password(payload: PasswordResetVerify, db: AsyncSession = Depend
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
 
     validate_password_strength(payload.new_password)
-    user.hashed_password = hash_password(payload.new_password)
+    try:
+        user.hashed_password = await hash_password_async(payload.new_password)
+        await auth_service.revoke_all_sessions(db, user)
 
-    await db.delete(otp_entry)
-    await db.commit()
+        await db.delete(otp_entry)
+        await db.commit()
+    finally:
+        invalidate_user(user.email)
 
     return {"msg": "Password has been reset successfully."}
 
@@ -154,18 +172,38 @@ async def logout(
     db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
-    blacklisted = BlacklistedToken(token=token)
-    db.add(blacklisted)
+    blacklisted = build_blacklist_entry(token)
+    await auth_service.blacklist_token(db, blacklisted)
+    await auth_service.revoke_session(db, token)
     await db.commit()
+    revocation_cache.add(blacklisted.jti, blacklisted.expires_at.timestamp())
     return {"msg": "Successfully logged out"}
 
+@router.post("/auth/logout-all")
+async def logout_all(db: AsyncSession = Depends(get_async_db), current_user: User = Depends(get_current_user)):
+    try:
+        await auth_service.revoke_all_sessions(db, current_user)
+        await db.commit()
+    finally:
+        invalidate_user(current_user.email)
+    return {"msg": "Logged out of all sessions"}
+
 @router.get("/api/v1/auth/google/callback", response_model=TokenResponse)
 async def google_callback(request: Request, code: str, db: AsyncSession = Depends(get_async_db)):
-    user_info = google_oauth.fetch_user_info_from_google(code)
-    token = await auth_service.create_or_merge_user_via_google(user_info, db)
-    return TokenResponse(access_token=token, token_type="bearer")
+    user_info = await google_oauth.fetch_user_info_from_google(code)
+    tokens = await auth_service.create_or_merge_user_via_google(user_info, db)
+    return TokenResponse(**tokens)
 
 @router.get("/api/v1/auth/google-login")
 async def google_login():
     auth_url, _ = get_google_login_url()
     return RedirectResponse(auth_url)
+
+@router.get("/.well-known/jwks.json")
+async def jwks():
+    # Public keys only; downstream services cache this and verify tokens locally.
+    return Response(
+        content=key_ring.jwks_json,
+        media_type="application/json",
+        headers={"Cache-Control": f"public, max-age={settings.JWKS_CACHE_MAX_AGE}"},
+    )
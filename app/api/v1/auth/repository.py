@@ -1,6 +1,14 @@
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from app.db.dialect import upsert_insert
 from app.db.models.user import User
+from app.db.models.refresh_token import RefreshToken
+from app.db.models.blacklisted_token import BlacklistedToken
+from app.core.principal_cache import invalidate_user
+from app.services.storage import release_objects, delete_unreferenced, profile_picture_keys
 
 async def get_user_by_email(db: AsyncSession, email: str):
     result = await db.execute(select(User).where(User.email == email))
@@ -21,9 +29,84 @@ async def create_user_from_google(db: AsyncSession, email: str, name: str, pictu
     return new_user
 
 async def update_user_profile_from_google(db: AsyncSession, user: User, name: str, picture: str = None):
-    user.name = name
-    if picture:
-        user.profile_picture = picture
-    await db.commit()
+    try:
+        user.name = name
+        unreferenced = []
+        if picture:
+            unreferenced = await release_objects(db, profile_picture_keys(user))
+            user.profile_picture = picture
+            user.profile_picture_variants = None
+        await db.commit()
+    finally:
+        invalidate_user(user.email)
+    if unreferenced:
+        await delete_unreferenced(unreferenced)
     await db.refresh(user)
     return user
+
+async def replace_password_hash(db: AsyncSession, email: str, old_hash: str, new_hash: str) -> bool:
+    # Only swaps the hash that was verified, so a concurrent password reset wins.
+    try:
+        result = await db.execute(
+            update(User)
+            .where(User.email == email, User.hashed_password == old_hash)
+            .values(hashed_password=new_hash)
+        )
+        await db.commit()
+    finally:
+        invalidate_user(email)
+    return result.rowcount > 0
+
+async def bump_token_version(db: AsyncSession, user_id: int):
+    # Incremented in SQL so concurrent bumps never collapse into one.
+    await db.execute(
+        update(User)
+        .where(User.id == user_id)
+        .values(token_version=User.token_version + 1)
+        .execution_options(synchronize_session=False)
+    )
+
+def add_refresh_token(db: AsyncSession, user_id: int, token_hash: str, family_id: str, expires_at: datetime):
+    db.add(RefreshToken(user_id=user_id, token_hash=token_hash, family_id=family_id, expires_at=expires_at))
+
+async def consume_refresh_token(db: AsyncSession, token_hash: str, now: datetime) -> Optional[tuple]:
+    # A single conditional UPDATE, so two concurrent refreshes cannot both win.
+    result = await db.execute(
+        update(RefreshToken)
+        .where(
+            RefreshToken.token_hash == token_hash,
+            RefreshToken.used_at.is_(None),
+            RefreshToken.revoked_at.is_(None),
+            RefreshToken.expires_at > now,
+        )
+        .values(used_at=now)
+        .returning(RefreshToken.user_id, RefreshToken.family_id)
+    )
+    return result.first()
+
+async def get_refresh_token(db: AsyncSession, token_hash: str) -> Optional[RefreshToken]:
+    result = await db.execute(select(RefreshToken).where(RefreshToken.token_hash == token_hash))
+    return result.scalar_one_or_none()
+
+async def revoke_refresh_family(db: AsyncSession, family_id: str, now: datetime):
+    await db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=now)
+    )
+
+async def revoke_user_refresh_tokens(db: AsyncSession, user_id: int, now: datetime):
+    await db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.user_id == user_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=now)
+    )
+
+async def blacklist_token(db: AsyncSession, jti: str, expires_at: datetime):
+    # A concurrent logout of the same token may have inserted it already.
+    insert = upsert_insert(db)
+    await db.execute(
+        insert(BlacklistedToken)
+        .values(jti=jti, expires_at=expires_at)
+        .on_conflict_do_nothing(index_elements=[BlacklistedToken.jti])
+    )
@@ -1,3 +1,4 @@
+from typing import Optional
 from pydantic import BaseModel, EmailStr
 
 class RegisterRequest(BaseModel):
@@ -24,6 +25,11 @@ class PasswordResetVerify(BaseModel):
     otp: str
     new_password: str
 
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
 class TokenResponse(BaseModel):
     access_token: str
     token_type: str = "bearer"
+    refresh_token: Optional[str] = None
+    expires_in: Optional[int] = None
@@ -1,8 +1,85 @@
+import logging
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+from fastapi import HTTPException, status
+from jose import jwt
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.api.v1.auth import repository
-from app.core.security import create_access_token
+from app.core.config import settings
+from app.core.security import (
+    create_access_token,
+    create_refresh_token,
+    hash_refresh_token,
+    hash_password_async,
+)
+from app.db.models.blacklisted_token import BlacklistedToken
+from app.db.models.user import User
+from app.db.session import AsyncSessionLocal
 
-async def create_or_merge_user_via_google(user_info: dict, db: AsyncSession) -> str:
+logger = logging.getLogger(__name__)
+
+async def _issue_tokens(db: AsyncSession, user: User, family_id: str) -> dict:
+    refresh_token, token_hash = create_refresh_token()
+    expires_at = datetime.now(timezone.utc) + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    repository.add_refresh_token(db, user.id, token_hash, family_id, expires_at)
+    await db.commit()
+    return {
+        # ``sid`` names the refresh token family so logout can revoke it; ``ver``
+        # ties the token to the user's current token_version.
+        "access_token": create_access_token(
+            data={"sub": user.email, "sid": family_id, "ver": user.token_version}
+        ),
+        "refresh_token": refresh_token,
+        "token_type": "bearer",
+        "expires_in": settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+    }
+
+async def issue_tokens(db: AsyncSession, user: User) -> dict:
+    """Start a new session: an access token and the first refresh token of a new family."""
+    return await _issue_tokens(db, user, uuid4().hex)
+
+async def rotate_refresh_token(db: AsyncSession, refresh_token: str) -> dict:
+    """Exchange a refresh token for a new token pair.
+
+    Each refresh token is single-use. Presenting one that was already rotated
+    (or revoked) means it leaked, so the whole family is revoked and the
+    legitimate holder has to log in again.
+    """
+    now = datetime.now(timezone.utc)
+    token_hash = hash_refresh_token(refresh_token)
+    consumed = await repository.consume_refresh_token(db, token_hash, now)
+    if consumed is None:
+        existing = await repository.get_refresh_token(db, token_hash)
+        if existing is not None and existing.used_at is not None and existing.revoked_at is None:
+            await repository.revoke_refresh_family(db, existing.family_id, now)
+            await db.commit()
+            logger.warning("Refresh token reuse for user %s; revoked family %s", existing.user_id, existing.family_id)
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token")
+
+    user_id, family_id = consumed
+    user = await db.get(User, user_id)
+    if user is None or not user.is_verified:
+        await db.rollback()
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token")
+    return await _issue_tokens(db, user, family_id)
+
+async def blacklist_token(db: AsyncSession, entry: BlacklistedToken) -> None:
+    # Idempotent, so concurrent logouts with the same token both succeed.
+    await repository.blacklist_token(db, entry.jti, entry.expires_at)
+
+async def revoke_session(db: AsyncSession, token: str) -> None:
+    # Only called with tokens get_current_user has already validated.
+    family_id = jwt.get_unverified_claims(token).get("sid")
+    if family_id:
+        await repository.revoke_refresh_family(db, family_id, datetime.now(timezone.utc))
+
+async def revoke_all_sessions(db: AsyncSession, user: User) -> None:
+    """Invalidate every access and refresh token the user holds: one UPDATE of
+    the token_version watermark plus one of their refresh tokens."""
+    await repository.bump_token_version(db, user.id)
+    await repository.revoke_user_refresh_tokens(db, user.id, datetime.now(timezone.utc))
+
+async def create_or_merge_user_via_google(user_info: dict, db: AsyncSession) -> dict:
     email = user_info.get("email")
     name = user_info.get("name")
     picture = user_info.get("picture")
@@ -13,6 +90,16 @@ async def create_or_merge_user_via_google(user_info: dict, db: AsyncSession) ->
     else:
         user = await repository.create_user_from_google(db, email, name, picture)
 
-    # Generate JWT
-    token = create_access_token(data={"sub": str(user.email)})
-    return token
+    return await issue_tokens(db, user)
+
+async def rehash_password(email: str, old_hash: str, password: str) -> None:
+    """Upgrade a verified hash to the current bcrypt rounds. Runs as a background
+    task after login; if the hashing pool is saturated it is skipped and retried
+    on the next login."""
+    try:
+        new_hash = await hash_password_async(password)
+    except HTTPException:
+        return
+    async with AsyncSessionLocal() as db:
+        if await repository.replace_password_hash(db, email, old_hash, new_hash):
+            logger.info("Rehashed password for user %s", email)
@@ -0,0 +1,93 @@
+# app/api/v1/ops/endpoints.py
+import secrets
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
+
+from app.core import metrics, principal_cache
+from app.core.config import settings
+from app.core.profiler import profiler
+from app.core.rate_limit import rejected_requests
+from app.core.revocation import revocation_cache
+from app.core.security import require_admin
+from app.core.startup import startup
+from app.db.session import get_pool_stats
+from app.services.email_service import email_dispatcher
+from app.utils.hashing import hashing_pool
+from app.utils.images import image_pool
+
+router = APIRouter()
+
+LOOPBACK_HOSTS = {"127.0.0.1", "::1", "localhost"}
+
+def require_metrics_access(request: Request) -> None:
+    # Scrapers present METRICS_TOKEN as a bearer token; without a token
+    # configured, only local clients (e.g. a sidecar agent) may scrape.
+    if settings.METRICS_TOKEN:
+        scheme, _, token = request.headers.get("authorization", "").partition(" ")
+        if scheme.lower() != "bearer" or not secrets.compare_digest(token, settings.METRICS_TOKEN):
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid metrics token")
+    elif request.client is None or request.client.host not in LOOPBACK_HOSTS:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Metrics are only served to local clients")
+
+@router.get("/healthz")
+async def healthz():
+    # Liveness only: the process is up and the event loop is responsive.
+    return {"status": "ok"}
+
+@router.get("/readyz")
+async def readyz():
+    status_code = status.HTTP_200_OK if startup.ready else status.HTTP_503_SERVICE_UNAVAILABLE
+    return JSONResponse(startup.status(), status_code=status_code)
+
+@router.get("/ops/stats", dependencies=[Depends(require_admin)])
+async def get_stats():
+    return {
+        "db_pool": get_pool_stats(),
+        "hashing_pool": hashing_pool.stats(),
+        "image_pool": image_pool.stats(),
+        "email_queue": email_dispatcher.stats(),
+        "revocation_cache": revocation_cache.stats(),
+        "principal_cache": principal_cache.stats(),
+        "rate_limit_rejections": dict(rejected_requests),
+        "startup": startup.status(include_error=True),
+    }
+
+@router.get("/metrics", dependencies=[Depends(require_metrics_access)])
+async def get_metrics():
+    body = metrics.render({
+        "db_pool": get_pool_stats(),
+        "hashing_pool": hashing_pool.stats(),
+        "image_pool": image_pool.stats(),
+        "email_queue": email_dispatcher.stats(),
+        "revocation_cache": revocation_cache.stats(),
+        "principal_cache": principal_cache.stats(),
+        "rate_limit_rejections": dict(rejected_requests),
+    })
+    return Response(content=body, media_type=metrics.CONTENT_TYPE)
+
+@router.post("/ops/profiler/start", dependencies=[Depends(require_admin)])
+async def start_profiler(
+    seconds: float = Query(30, gt=0, le=600),
+    interval_ms: float = Query(5, ge=1, le=1000),
+    sample_rate: float = Query(1.0, gt=0, le=1),
+    all_threads: bool = False,
+):
+    try:
+        profiler.start(seconds, interval_ms / 1000, sample_rate, all_threads)
+    except RuntimeError as exc:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(exc))
+    return profiler.status()
+
+@router.post("/ops/profiler/stop", dependencies=[Depends(require_admin)])
+async def stop_profiler():
+    profiler.stop()
+    return profiler.status()
+
+@router.get("/ops/profiler", dependencies=[Depends(require_admin)])
+async def get_profiler_status():
+    return profiler.status()
+
+@router.get("/ops/profiler/stacks", response_class=PlainTextResponse, dependencies=[Depends(require_admin)])
+async def get_profiler_stacks():
+    # Folded stacks: feed to flamegraph.pl or load into speedscope.
+    return profiler.folded()
@@ -1,5 +1,5 @@
 # app/api/v1/user/endpoints.py
-from fastapi import APIRouter, Depends, Request
+from fastapi import APIRouter, BackgroundTasks, Depends, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.session import get_async_db
 from app.api.v1.user.schema import UserProfileResponse, UserProfileUpdateMultipart
@@ -15,6 +15,7 @@ async def get_my_profile(current_user: User = Depends(get_current_user)):
 
 @router.patch("/user/profile", response_model=UserProfileResponse)
 async def update_my_profile(
+    background_tasks: BackgroundTasks,
     form_data: UserProfileUpdateMultipart = Depends(),
     db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
@@ -25,5 +26,6 @@ async def update_my_profile(
         user=current_user,
         form_data=form_data,
         base_url=str(request.base_url),
+        background_tasks=background_tasks,
     )
     return service.build_user_profile_response(updated_user)
@@ -1,7 +1,27 @@
+from typing import List, Optional
+from sqlalchemy import update
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.models.user import User
+from app.core.principal_cache import invalidate_user
+
+async def get_user_by_id(db: AsyncSession, user_id: int) -> User:
+    return await db.get(User, user_id)
+
+async def swap_profile_picture(
+    db: AsyncSession, user_id: int, expected: Optional[str], picture: str, variants: List[dict]
+) -> bool:
+    """Set the user's picture only if it is still ``expected``; False means a
+    concurrent update replaced it first."""
+    result = await db.execute(
+        update(User)
+        .where(User.id == user_id, User.profile_picture.is_not_distinct_from(expected))
+        .values(profile_picture=picture, profile_picture_variants=variants)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount > 0
 
 async def save_user_changes(db: AsyncSession, user: User) -> User:
     await db.commit()
+    invalidate_user(user.email)
     await db.refresh(user)
     return user
@@ -1,14 +1,20 @@
 # app/api/v1/user/schema.py
 from pydantic import BaseModel, EmailStr
-from typing import Optional
+from typing import List, Optional
 from fastapi import UploadFile, File, Form
 
 # RESPONSE SCHEMA
+class ProfilePictureVariant(BaseModel):
+    size: int
+    format: str
+    url: str
+
 class UserProfileResponse(BaseModel):
     id: int
     name: str
     email: EmailStr
     profile_picture_url: Optional[str] = None
+    profile_picture_variants: List[ProfilePictureVariant] = []
 
     class Config:
         orm_mode = True
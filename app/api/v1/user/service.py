@@ -1,14 +1,26 @@
-import os
-import shutil
-from uuid import uuid4
-from fastapi import HTTPException, status
+import hashlib
+from typing import List, Optional, Tuple
+import anyio
+from fastapi import BackgroundTasks, HTTPException, UploadFile, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.api.v1.user.schema import UserProfileUpdateMultipart
 from app.api.v1.user import repository
+from app.core.config import settings
+from app.core.principal_cache import invalidate_user
 from app.db.models.user import User
+from app.services.storage import (
+    storage,
+    content_key,
+    reserve_objects,
+    abandon_objects,
+    release_objects,
+    delete_unreferenced,
+    profile_picture_keys,
+)
+from app.utils.images import render_variants_async
 
-ALLOWED_IMAGE_TYPES = {"image/jpeg", "image/png", "image/webp"}
-PROFILE_PIC_DIR = "profile_pictures"
+UPLOAD_CHUNK_SIZE = 64 * 1024
+CONTENT_TYPES = {"jpg": "image/jpeg", "png": "image/png", "webp": "image/webp"}
 
 def build_user_profile_response(user: User):
     return {
@@ -16,38 +28,138 @@ def build_user_profile_response(user: User):
         "name": user.name,
         "email": user.email,
         "profile_picture_url": user.profile_picture,
+        "profile_picture_variants": user.profile_picture_variants or [],
     }
 
-async def update_user_profile(db: AsyncSession, user: User, form_data: UserProfileUpdateMultipart, base_url: str):
-    if form_data.name:
-        user.name = form_data.name
-
-    if form_data.file:
-        file = form_data.file
-        if file.content_type not in ALLOWED_IMAGE_TYPES:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Invalid file type. Only JPEG, PNG, and WEBP images are allowed.",
-            )
-
-        ext = file.filename.split(".")[-1]
-        filename = f"{uuid4().hex}.{ext}"
-        filepath = os.path.join(PROFILE_PIC_DIR, filename)
-
-        os.makedirs(PROFILE_PIC_DIR, exist_ok=True)
-        with open(filepath, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-
-        if user.profile_picture:
-            old_file = user.profile_picture.split("/")[-1]
-            old_path = os.path.join(PROFILE_PIC_DIR, old_file)
-            if os.path.exists(old_path):
-                try:
-                    os.remove(old_path)
-                except Exception as e:
-                    print(f"Warning: Could not delete old profile picture: {e}")
-
-        user.profile_picture = f"{base_url}profile_pictures/{filename}"
-
-    updated_user = await repository.save_user_changes(db, user)
+def profile_picture_url(base_url: str, key: str) -> str:
+    if settings.PROFILE_PICTURE_BASE_URL:
+        return f"{settings.PROFILE_PICTURE_BASE_URL.rstrip('/')}/{key}"
+    return f"{base_url}profile_pictures/{key}"
+
+def sniff_image_extension(header: bytes) -> Optional[str]:
+    # Trust the file's magic bytes, not the client-supplied content type.
+    if header.startswith(b"\xff\xd8\xff"):
+        return "jpg"
+    if header.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "png"
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "webp"
+    return None
+
+def _too_large() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"Profile picture must be at most {settings.PROFILE_PICTURE_MAX_BYTES} bytes.",
+    )
+
+async def receive_profile_picture(file: UploadFile) -> Tuple[str, str]:
+    """Stream an upload into a temp file in storage and return
+    ``(temp_path, content_key)``; the key is derived from the file's hash."""
+    if file.size is not None and file.size > settings.PROFILE_PICTURE_MAX_BYTES:
+        raise _too_large()
+
+    chunk = await file.read(UPLOAD_CHUNK_SIZE)
+    ext = sniff_image_extension(chunk)
+    if ext is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid file type. Only JPEG, PNG, and WEBP images are allowed.",
+        )
+
+    await anyio.to_thread.run_sync(storage.ensure_ready)
+    temp_path = storage.temp_path()
+    digest = hashlib.sha256()
+    written = 0
+    try:
+        async with await anyio.open_file(temp_path, "wb") as buffer:
+            while chunk:
+                written += len(chunk)
+                if written > settings.PROFILE_PICTURE_MAX_BYTES:
+                    raise _too_large()
+                digest.update(chunk)
+                await buffer.write(chunk)
+                chunk = await file.read(UPLOAD_CHUNK_SIZE)
+    except BaseException:
+        await storage.discard_temp(temp_path)
+        raise
+
+    return temp_path, content_key(digest.hexdigest(), ext)
+
+async def store_profile_picture(file: UploadFile, base_url: str) -> Tuple[str, List[dict], List[str]]:
+    """Store an upload and its rendered variants; returns the picture URL,
+    the variant list for the user row and every storage key written.
+
+    The keys are reserved before anything is written, so the caller owns one
+    reference per key and must ``abandon_objects`` them if it does not commit.
+    """
+    temp_path, key = await receive_profile_picture(file)
+    try:
+        variants = await render_variants_async(temp_path)
+        variant_keys = [content_key(hashlib.sha256(v["data"]).hexdigest(), v["ext"]) for v in variants]
+        keys = [key] + variant_keys
+        await reserve_objects(keys)
+    except BaseException:
+        await storage.discard_temp(temp_path)
+        raise
+
+    try:
+        await storage.put_file(key, temp_path, CONTENT_TYPES[key.rsplit(".", 1)[-1]])
+        for variant, variant_key in zip(variants, variant_keys):
+            await storage.put_bytes(variant_key, variant["data"], CONTENT_TYPES[variant["ext"]])
+    except BaseException:
+        await storage.discard_temp(temp_path)
+        await abandon_objects(keys)
+        raise
+
+    variant_entries = [
+        {
+            "size": variant["size"],
+            "format": variant["format"],
+            "url": profile_picture_url(base_url, variant_key),
+        }
+        for variant, variant_key in zip(variants, variant_keys)
+    ]
+    return profile_picture_url(base_url, key), variant_entries, keys
+
+async def update_user_profile(
+    db: AsyncSession,
+    user: User,
+    form_data: UserProfileUpdateMultipart,
+    base_url: str,
+    background_tasks: BackgroundTasks,
+):
+    # The authenticated principal is a shared, detached cache entry (see
+    # get_current_user), so this loads the session's own instance to write to.
+    email = user.email
+    user = await repository.get_user_by_id(db, user.id)
+    try:
+        unreferenced = []
+        if form_data.file:
+            # The new keys are already referenced by store_profile_picture, so
+            # content shared by the old and new picture never reaches zero here.
+            picture_url, variants, new_keys = await store_profile_picture(form_data.file, base_url)
+            try:
+                # Only release the picture this update actually replaced: a
+                # concurrent upload may have swapped it since the row was read.
+                while not await repository.swap_profile_picture(
+                    db, user.id, user.profile_picture, picture_url, variants
+                ):
+                    await db.refresh(user)
+                unreferenced = await release_objects(db, profile_picture_keys(user))
+                await db.commit()
+            except BaseException:
+                # Roll back first: this transaction may hold locks that
+                # abandon_objects, in its own session, would wait on.
+                await db.rollback()
+                await abandon_objects(new_keys)
+                raise
+
+        if form_data.name:
+            user.name = form_data.name
+
+        updated_user = await repository.save_user_changes(db, user)
+    finally:
+        invalidate_user(email)
+    if unreferenced:
+        background_tasks.add_task(delete_unreferenced, unreferenced)
     return updated_user
@@ -0,0 +1,100 @@
+# app/core/assets.py
+import mimetypes
+import os
+import stat
+from typing import Optional
+import anyio
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Receive, Scope, Send
+
+# Checked in order of preference when precompressed siblings are enabled.
+PRECOMPRESSED_ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+
+class AssetFileResponse(FileResponse):
+    """FileResponse that hands whole-file bodies to the server when it
+    advertises the ASGI zero-copy or path-send extensions."""
+
+    chunk_size = 256 * 1024
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self._extensions = scope.get("extensions") or {}
+        await super().__call__(scope, receive, send)
+
+    async def _handle_simple(self, send: Send, send_header_only: bool) -> None:
+        if send_header_only:
+            return await super()._handle_simple(send, send_header_only)
+
+        if "http.response.zerocopysend" in self._extensions:
+            await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+            with open(self.path, "rb") as file:
+                await send({"type": "http.response.zerocopysend", "file": file, "more_body": False})
+        elif "http.response.pathsend" in self._extensions:
+            await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+            await send({"type": "http.response.pathsend", "path": os.fspath(self.path)})
+        else:
+            await super()._handle_simple(send, send_header_only)
+
+
+class ImmutableStaticFiles(StaticFiles):
+    """Static files whose names never change once written.
+
+    Every response is cacheable forever (``Cache-Control: immutable``) and
+    carries a strong ETag derived from the file name, which is either a uuid
+    or a content hash, so the tag is identical on every node and conditional
+    requests are answered with 304 without touching the file body.
+    """
+
+    def __init__(self, *args, max_age: int = 31536000, precompressed: bool = False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.max_age = max_age
+        self.precompressed = precompressed
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        if self.precompressed and scope["method"] in ("GET", "HEAD"):
+            response = await self._precompressed_response(path, scope)
+            if response is not None:
+                return response
+        return await super().get_response(path, scope)
+
+    async def _precompressed_response(self, path: str, scope: Scope) -> Optional[Response]:
+        accepted = Headers(scope=scope).get("accept-encoding", "")
+        for encoding, suffix in PRECOMPRESSED_ENCODINGS:
+            if encoding not in accepted:
+                continue
+            full_path, stat_result = await anyio.to_thread.run_sync(self.lookup_path, path + suffix)
+            if stat_result is not None and stat.S_ISREG(stat_result.st_mode):
+                return self.file_response(full_path, stat_result, scope, encoding=encoding, original_path=path)
+        return None
+
+    def file_response(
+        self,
+        full_path,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+        encoding: Optional[str] = None,
+        original_path: Optional[str] = None,
+    ) -> Response:
+        name = os.path.basename(original_path or full_path)
+        headers = {
+            "cache-control": f"public, max-age={self.max_age}, immutable",
+            "etag": f'"{os.path.splitext(name)[0]}{"-" + encoding if encoding else ""}"',
+        }
+        if self.precompressed:
+            headers["vary"] = "Accept-Encoding"
+        if encoding:
+            headers["content-encoding"] = encoding
+
+        response = AssetFileResponse(
+            full_path,
+            status_code=status_code,
+            headers=headers,
+            stat_result=stat_result,
+            media_type=mimetypes.guess_type(name)[0],
+        )
+        if self.is_not_modified(response.headers, Headers(scope=scope)):
+            return NotModifiedResponse(response.headers)
+        return response
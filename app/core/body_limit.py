@@ -0,0 +1,54 @@
+# app/core/body_limit.py
+from typing import Dict, Tuple
+from fastapi import HTTPException, status
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import Message, Receive, Scope, Send
+
+# Room for the multipart boundaries, part headers and small form fields that
+# travel alongside an upload.
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+
+class RequestBodyLimitMiddleware:
+    """Caps the request body of selected routes before anything parses it.
+
+    ``limits`` maps ``(method, path)`` to a maximum body size in bytes. A
+    declared Content-Length over the limit is answered with 413 without reading
+    the body; otherwise the body is counted as it is received and the request
+    fails with 413 as soon as it passes the limit, so Starlette never spools
+    more than that to disk.
+    """
+
+    def __init__(self, app, limits: Dict[Tuple[str, str], int]):
+        self.app = app
+        self.limits = limits
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        limit = None
+        if scope["type"] == "http":
+            limit = self.limits.get((scope["method"], scope["path"]))
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        detail = f"Request body must be at most {limit} bytes."
+        content_length = Headers(scope=scope).get("content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > limit:
+            response = JSONResponse({"detail": detail}, status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    # Raised inside body parsing, which FastAPI turns into the response.
+                    raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=detail)
+            return message
+
+        await self.app(scope, limited_receive, send)
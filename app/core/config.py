@@ -1,17 +1,145 @@
+from typing import List, Optional
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
     DATABASE_URL: str
     ASYNC_DATABASE_URL:str
+
+    # Connection pool: a preset ("default", "production" or "pgbouncer") plus
+    # optional per-setting overrides
+    DB_POOL_PRESET: str = "default"
+    DB_POOL_SIZE: Optional[int] = None
+    DB_MAX_OVERFLOW: Optional[int] = None
+    DB_POOL_TIMEOUT: Optional[float] = None
+    DB_POOL_RECYCLE: Optional[int] = None
+    DB_POOL_PRE_PING: Optional[bool] = None
+    DB_STATEMENT_CACHE_SIZE: Optional[int] = None
+    DB_PREPARED_STATEMENT_CACHE_SIZE: Optional[int] = None
+    # python -m app.serve: total connections across all workers, split into
+    # fixed per-worker pools (0 = use the pool settings above as they are)
+    DB_MAX_CONNECTIONS: int = 0
+
+    # python -m app.serve (0 workers = one per available CPU; 0 max requests = never recycle)
+    SERVER_HOST: str = "0.0.0.0"
+    SERVER_PORT: int = 8000
+    SERVER_WORKERS: int = 0
+    SERVER_MAX_REQUESTS: int = 0
+    SERVER_MAX_REQUESTS_JITTER: int = 0
+    SERVER_GRACEFUL_TIMEOUT_SECONDS: float = 30
+    SERVER_SHUTDOWN_DELAY_SECONDS: float = 0
+
     SECRET_KEY: str
     ALGORITHM: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int
+    # Rotating refresh tokens issued with every access token. With short-lived
+    # access tokens the per-request revocation check can be switched off; logout
+    # then takes effect once the access token expires.
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 30
+    # Asymmetric signing (RS256/ES256) from PEM files. The first private key, or
+    # JWT_ACTIVE_KID, signs; every listed key verifies and is published in the
+    # JWKS. With no keys, tokens are signed with SECRET_KEY/ALGORITHM.
+    JWT_PRIVATE_KEY_FILES: List[str] = []
+    JWT_PUBLIC_KEY_FILES: List[str] = []
+    JWT_ACTIVE_KID: str = ""
+    JWT_ACCEPT_LEGACY_TOKENS: bool = True  # keep verifying kid-less SECRET_KEY tokens
+    JWKS_CACHE_MAX_AGE: int = 300
+    ACCESS_TOKEN_REVOCATION_CHECK: bool = True
     OTP_LIFETIME_MINUTES: int
     RESEND_COOLDOWN_SECONDS:int
     MAIL_SENDER:str
+    # Outgoing email ("mock", "smtp" or "spool")
+    EMAIL_TRANSPORT: str = "mock"
+    EMAIL_SMTP_HOST: str = "localhost"
+    EMAIL_SMTP_PORT: int = 1025
+    EMAIL_SPOOL_DIR: str = "email_spool"
+    EMAIL_QUEUE_SIZE: int = 1000
+    EMAIL_WORKERS: int = 2
+    EMAIL_BATCH_SIZE: int = 20
+    EMAIL_MAX_RETRIES: int = 3
     GOOGLE_CLIENT_ID:str
     GOOGLE_CLIENT_SECRET:str
     GOOGLE_REDIRECT_URI:str
+    # Override to point the OAuth client at a local stand-in server
+    GOOGLE_TOKEN_URI: str = ""
+    GOOGLE_USERINFO_URI: str = ""
+    GOOGLE_HTTP_TIMEOUT_SECONDS: float = 5
+    GOOGLE_HTTP_RETRIES: int = 2
+    GOOGLE_HTTP_MAX_CONNECTIONS: int = 20
+
+    # Password hashing worker pool ("thread" or "process"; 0 workers = one per core)
+    HASH_POOL_KIND: str = "thread"
+    HASH_POOL_WORKERS: int = 0
+    HASH_POOL_MAX_QUEUE: int = 64
+
+    # bcrypt work factor: a fixed BCRYPT_ROUNDS, or calibrated at startup so one
+    # hash takes about BCRYPT_TARGET_MS on this hardware (0 keeps passlib's default)
+    BCRYPT_ROUNDS: Optional[int] = None
+    BCRYPT_TARGET_MS: float = 250
+    BCRYPT_MIN_ROUNDS: int = 10
+    BCRYPT_MAX_ROUNDS: int = 16
+    BCRYPT_REHASH_ON_LOGIN: bool = True
+
+    # Token revocation cache ("memory", "bloom" or "database" to disable caching)
+    REVOCATION_BACKEND: str = "memory"
+    REVOCATION_CACHE_SIZE: int = 100_000
+    REVOCATION_BLOOM_CAPACITY: int = 1_000_000
+    REVOCATION_BLOOM_ERROR_RATE: float = 0.001
+    REVOCATION_SYNC_SECONDS: float = 5
+
+    # Authenticated User rows cached by token subject (0 disables the cache)
+    PRINCIPAL_CACHE_TTL_SECONDS: float = 30
+    PRINCIPAL_CACHE_SIZE: int = 10_000
+
+    # Auth endpoint rate limits ("<count>/<second|minute|hour|day>", empty = unlimited)
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_BACKEND: str = "memory"  # or "redis"
+    RATE_LIMIT_REDIS_URL: str = "redis://localhost:6379/0"
+    RATE_LIMIT_ALGORITHM: str = "token_bucket"  # or "sliding_window"
+    RATE_LIMIT_LOGIN_PER_IP: str = "30/minute"
+    RATE_LIMIT_LOGIN_PER_EMAIL: str = "10/minute"
+    RATE_LIMIT_OTP_VERIFY_PER_IP: str = "30/minute"
+    RATE_LIMIT_OTP_VERIFY_PER_EMAIL: str = "5/minute"
+    RATE_LIMIT_OTP_SEND_PER_IP: str = "10/minute"
+
+    # Profile picture storage ("local" directory or "object" store stand-in)
+    STORAGE_BACKEND: str = "local"
+    STORAGE_LOCAL_DIR: str = "profile_pictures"
+    STORAGE_OBJECT_ROOT: str = "object_store"
+    STORAGE_OBJECT_BUCKET: str = "profile-pictures"
+
+    # Profile picture uploads
+    PROFILE_PICTURE_MAX_BYTES: int = 5 * 1024 * 1024
+    # Public base for picture URLs (e.g. a CDN or nginx location); defaults to this app
+    PROFILE_PICTURE_BASE_URL: str = ""
+    PROFILE_PICTURE_CACHE_MAX_AGE: int = 31536000
+    PROFILE_PICTURE_PRECOMPRESSED: bool = False
+    PROFILE_PICTURE_VARIANT_SIZES: List[int] = [48, 128, 512]
+    PROFILE_PICTURE_VARIANT_FORMATS: List[str] = ["webp", "jpeg"]
+    IMAGE_POOL_KIND: str = "thread"
+    IMAGE_POOL_WORKERS: int = 0
+    IMAGE_POOL_MAX_QUEUE: int = 32
+
+    # Expired OTP / blacklisted token cleanup (0 disables the in-process reaper)
+    REAPER_INTERVAL_SECONDS: float = 300
+    REAPER_BATCH_SIZE: int = 1000
+
+    # Startup warm-up (DB pool, revocation cache, bcrypt) runs in the background;
+    # /readyz answers 503 until it has succeeded, retrying at this interval
+    STARTUP_WARMUP_RETRY_SECONDS: float = 2
+
+    # Per-route latency / DB / bcrypt metrics served at /metrics
+    METRICS_ENABLED: bool = True
+    SLOW_REQUEST_SECONDS: float = 0  # log requests slower than this; 0 disables
+    # Bearer token scrapers must send to /metrics; empty = loopback clients only
+    METRICS_TOKEN: str = ""
+
+    # Accounts allowed to use the admin-only ops endpoints (e.g. the profiler)
+    ADMIN_EMAILS: List[str] = []
+    # Admin batch endpoints: users per request and per database round trip
+    ADMIN_BATCH_MAX_ITEMS: int = 100_000
+    ADMIN_BATCH_CHUNK_SIZE: int = 1000
+    PROFILER_ENABLED: bool = True
+    PROFILER_OUTPUT_DIR: str = ""  # also write finished sessions here as .folded files
 
     class Config:
         env_file = ".env"
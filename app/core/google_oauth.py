@@ -1,6 +1,15 @@
-import requests
+import asyncio
+import random
+from typing import TYPE_CHECKING, Optional
 from urllib.parse import urlencode
+
+from fastapi import HTTPException, status
+
 from app.core.config import settings
+from app.core.metrics import timed, upstream_request_duration
+
+if TYPE_CHECKING:
+    import httpx
 
 GOOGLE_CLIENT_ID = settings.GOOGLE_CLIENT_ID
 GOOGLE_CLIENT_SECRET = settings.GOOGLE_CLIENT_SECRET
@@ -13,6 +22,122 @@ GOOGLE_USERINFO_URI = "https://www.googleapis.com/oauth2/v1/userinfo"
 SCOPES = ["https://www.googleapis.com/auth/userinfo.profile", "https://www.googleapis.com/auth/userinfo.email"]
 
 
+class GoogleOAuthClient:
+    """Async client for Google's token and userinfo endpoints.
+
+    One keep-alive connection pool is shared by all requests on the worker.
+    Connection failures, 429s and 5xx responses are retried with jittered
+    exponential backoff; anything else is surfaced as a 502.  The token
+    exchange is not idempotent (Google accepts an authorization code once), so
+    it is only retried when the request cannot have reached Google: connect
+    failures and 429s.  Point
+    ``token_uri``/``userinfo_uri`` (or pass an httpx ``transport``) at a local
+    stand-in to exercise the flow without Google.
+    """
+
+    def __init__(
+        self,
+        token_uri: str = GOOGLE_TOKEN_URI,
+        userinfo_uri: str = GOOGLE_USERINFO_URI,
+        timeout: float = 5.0,
+        retries: int = 2,
+        backoff: float = 0.2,
+        max_connections: int = 20,
+        transport: Optional["httpx.AsyncBaseTransport"] = None,
+    ):
+        self.token_uri = token_uri
+        self.userinfo_uri = userinfo_uri
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_connections = max_connections
+        self.transport = transport
+        self._client: Optional["httpx.AsyncClient"] = None
+
+    def _get_client(self) -> "httpx.AsyncClient":
+        # httpx is only imported once Google sign-in is first used.
+        import httpx
+
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+                transport=self.transport,
+            )
+        return self._client
+
+    async def _request(self, method: str, url: str, idempotent: bool = True, **kwargs) -> dict:
+        import httpx
+
+        # Errors raised before the request was sent are always safe to retry.
+        unsent_errors = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+        client = self._get_client()
+        for attempt in range(self.retries + 1):
+            retryable = attempt < self.retries
+            try:
+                response = await client.request(method, url, **kwargs)
+            except httpx.TransportError as exc:
+                if not retryable or not (idempotent or isinstance(exc, unsent_errors)):
+                    raise HTTPException(
+                        status_code=status.HTTP_502_BAD_GATEWAY,
+                        detail="Could not reach Google",
+                    )
+            else:
+                if response.status_code == 429 or response.status_code >= 500:
+                    if not retryable or not (idempotent or response.status_code == 429):
+                        raise HTTPException(
+                            status_code=status.HTTP_502_BAD_GATEWAY,
+                            detail="Google sign-in is temporarily unavailable",
+                        )
+                elif response.is_error:
+                    raise HTTPException(
+                        status_code=status.HTTP_502_BAD_GATEWAY,
+                        detail="Google rejected the sign-in request",
+                    )
+                else:
+                    try:
+                        return response.json()
+                    except ValueError:
+                        raise HTTPException(
+                            status_code=status.HTTP_502_BAD_GATEWAY,
+                            detail="Google returned an invalid response",
+                        )
+            await asyncio.sleep(random.uniform(0, self.backoff * 2 ** attempt))
+
+    async def fetch_user_info(self, code: str) -> dict:
+        data = {
+            "code": code,
+            "client_id": GOOGLE_CLIENT_ID,
+            "client_secret": GOOGLE_CLIENT_SECRET,
+            "redirect_uri": GOOGLE_REDIRECT_URI,
+            "grant_type": "authorization_code",
+        }
+        with timed(upstream_request_duration, "google", "token", request_field="upstream_seconds"):
+            token_data = await self._request("POST", self.token_uri, idempotent=False, data=data)
+        access_token = token_data.get("access_token")
+
+        headers = {"Authorization": f"Bearer {access_token}"}
+        with timed(upstream_request_duration, "google", "userinfo", request_field="upstream_seconds"):
+            return await self._request("GET", self.userinfo_uri, headers=headers)
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+google_client = GoogleOAuthClient(
+    token_uri=settings.GOOGLE_TOKEN_URI or GOOGLE_TOKEN_URI,
+    userinfo_uri=settings.GOOGLE_USERINFO_URI or GOOGLE_USERINFO_URI,
+    timeout=settings.GOOGLE_HTTP_TIMEOUT_SECONDS,
+    retries=settings.GOOGLE_HTTP_RETRIES,
+    max_connections=settings.GOOGLE_HTTP_MAX_CONNECTIONS,
+)
+
+
 def get_google_login_url():
     params = {
         "client_id": GOOGLE_CLIENT_ID,
@@ -26,19 +151,5 @@ def get_google_login_url():
     return url, None
 
 
-def fetch_user_info_from_google(code: str):
-    data = {
-        "code": code,
-        "client_id": GOOGLE_CLIENT_ID,
-        "client_secret": GOOGLE_CLIENT_SECRET,
-        "redirect_uri": GOOGLE_REDIRECT_URI,
-        "grant_type": "authorization_code",
-    }
-    token_response = requests.post(GOOGLE_TOKEN_URI, data=data)
-    token_response.raise_for_status()
-    access_token = token_response.json().get("access_token")
-
-    headers = {"Authorization": f"Bearer {access_token}"}
-    userinfo_response = requests.get(GOOGLE_USERINFO_URI, headers=headers)
-    userinfo_response.raise_for_status()
-    return userinfo_response.json()
+async def fetch_user_info_from_google(code: str):
+    return await google_client.fetch_user_info(code)
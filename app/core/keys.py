@@ -0,0 +1,154 @@
+# app/core/keys.py
+import argparse
+import base64
+import hashlib
+import json
+import os
+from dataclasses import dataclass
+from typing import List, Optional
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, rsa
+from jose import jwk, jwt, JWTError
+from jose.backends.base import Key
+
+from app.core.config import settings
+
+EC_ALGORITHMS = {"secp256r1": "ES256", "secp384r1": "ES384", "secp521r1": "ES512"}
+THUMBPRINT_MEMBERS = {"RSA": ("e", "kty", "n"), "EC": ("crv", "kty", "x", "y")}
+
+
+def _algorithm_for(key) -> str:
+    if isinstance(key, (rsa.RSAPrivateKey, rsa.RSAPublicKey)):
+        return "RS256"
+    if isinstance(key, (ec.EllipticCurvePrivateKey, ec.EllipticCurvePublicKey)) and key.curve.name in EC_ALGORITHMS:
+        return EC_ALGORITHMS[key.curve.name]
+    # python-jose has no EdDSA support, so Ed25519 keys are rejected here too.
+    raise ValueError(f"Unsupported JWT signing key: {type(key).__name__}; use RSA or EC P-256/P-384/P-521")
+
+
+def jwk_thumbprint(public_jwk: dict) -> str:
+    """RFC 7638 thumbprint, used as ``kid`` so every node derives the same id."""
+    members = {name: public_jwk[name] for name in THUMBPRINT_MEMBERS[public_jwk["kty"]]}
+    canonical = json.dumps(members, separators=(",", ":"), sort_keys=True)
+    digest = hashlib.sha256(canonical.encode()).digest()
+    return base64.urlsafe_b64encode(digest).rstrip(b"=").decode()
+
+
+@dataclass
+class SigningKey:
+    kid: str
+    algorithm: str
+    verifier: Key
+    signer: Optional[Key] = None
+
+    @classmethod
+    def from_pem(cls, pem: bytes) -> "SigningKey":
+        if b"PRIVATE KEY" in pem:
+            private = serialization.load_pem_private_key(pem, password=None)
+            public = private.public_key()
+        else:
+            private, public = None, serialization.load_pem_public_key(pem)
+        algorithm = _algorithm_for(public)
+        public_pem = public.public_bytes(
+            serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+        )
+        verifier = jwk.construct(public_pem, algorithm)
+        signer = jwk.construct(pem, algorithm) if private is not None else None
+        return cls(jwk_thumbprint(verifier.to_dict()), algorithm, verifier, signer)
+
+    def public_jwk(self) -> dict:
+        return {**self.verifier.to_dict(), "kid": self.kid, "use": "sig"}
+
+
+class KeyRing:
+    """Keys that sign and verify access tokens, parsed once per process.
+
+    With asymmetric keys configured, tokens are signed by the active key and
+    carry its ``kid``; any listed key verifies, so a new key can be published
+    in the JWKS before it starts signing and an old one kept (public half only)
+    until its tokens have expired. Without keys, tokens are signed with the
+    shared ``SECRET_KEY`` as before. Tokens without a ``kid`` are verified with
+    that secret while ``accept_legacy`` is set.
+    """
+
+    def __init__(
+        self,
+        keys: List[SigningKey],
+        active_kid: str = "",
+        secret: str = "",
+        secret_algorithm: str = "HS256",
+        accept_legacy: bool = True,
+    ):
+        self.keys = {key.kid: key for key in keys}
+        self.secret = secret
+        self.secret_algorithm = secret_algorithm
+        self.accept_legacy = accept_legacy
+        if active_kid:
+            self.active = self.keys.get(active_kid)
+            if self.active is None or self.active.signer is None:
+                raise ValueError(f"JWT_ACTIVE_KID {active_kid!r} does not name a configured private key")
+        else:
+            self.active = next((key for key in keys if key.signer is not None), None)
+            if keys and self.active is None:
+                raise ValueError("JWT keys are configured but none of them is a private key")
+        self.jwks_json = json.dumps({"keys": [key.public_jwk() for key in keys]}).encode()
+
+    def encode(self, claims: dict) -> str:
+        if self.active is None:
+            return jwt.encode(claims, self.secret, algorithm=self.secret_algorithm)
+        return jwt.encode(
+            claims, self.active.signer, algorithm=self.active.algorithm, headers={"kid": self.active.kid}
+        )
+
+    def decode(self, token: str) -> dict:
+        kid = jwt.get_unverified_header(token).get("kid")
+        if kid is None:
+            if self.active is not None and not self.accept_legacy:
+                raise JWTError("Token has no key id")
+            return jwt.decode(token, self.secret, algorithms=[self.secret_algorithm])
+        key = self.keys.get(kid)
+        if key is None:
+            raise JWTError("Unknown key id")
+        # The algorithm comes from our key, never from the token header.
+        return jwt.decode(token, key.verifier, algorithms=[key.algorithm])
+
+
+def build_key_ring() -> KeyRing:
+    keys = []
+    for path in settings.JWT_PRIVATE_KEY_FILES + settings.JWT_PUBLIC_KEY_FILES:
+        with open(path, "rb") as f:
+            keys.append(SigningKey.from_pem(f.read()))
+    return KeyRing(
+        keys,
+        active_kid=settings.JWT_ACTIVE_KID,
+        secret=settings.SECRET_KEY,
+        secret_algorithm=settings.ALGORITHM,
+        accept_legacy=settings.JWT_ACCEPT_LEGACY_TOKENS,
+    )
+
+
+key_ring = build_key_ring()
+
+
+def generate_key(kind: str) -> bytes:
+    if kind == "rsa":
+        private = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    elif kind == "ec":
+        private = ec.generate_private_key(ec.SECP256R1())
+    else:
+        raise ValueError(f"Unknown key type: {kind}")
+    return private.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a JWT signing key and print its kid.")
+    parser.add_argument("path", help="where to write the PEM private key")
+    parser.add_argument("--type", choices=("rsa", "ec"), default="ec", help="rsa = RS256, ec = ES256")
+    args = parser.parse_args()
+    pem = generate_key(args.type)
+    with os.fdopen(os.open(args.path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600), "wb") as f:
+        f.write(pem)
+    print(SigningKey.from_pem(pem).kid)
@@ -0,0 +1,255 @@
+# app/core/metrics.py
+import bisect
+import contextvars
+import logging
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Optional, Sequence
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values = defaultdict(float)
+
+    def inc(self, *label_values: str, amount: float = 1.0) -> None:
+        self._values[label_values] += amount
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        for label_values, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labels, label_values)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts, sum, count]
+        self._series = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        series = self._series.get(label_values)
+        if series is None:
+            series = self._series[label_values] = [[0] * len(self.buckets), 0.0, 0]
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            series[0][index] += 1
+        series[1] += value
+        series[2] += 1
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for label_values, (counts, total, count) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labels, label_values, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labels, label_values, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{labels} {count}")
+            labels = _format_labels(self.labels, label_values)
+            lines.append(f"{self.name}_sum{labels} {total}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+http_requests = Counter(
+    "http_requests_total", "HTTP requests by route and status.", ("method", "route", "status")
+)
+http_request_duration = Histogram(
+    "http_request_duration_seconds", "Time until the response was sent.", ("method", "route")
+)
+http_request_db_queries = Histogram(
+    "http_request_db_queries", "Database queries issued per request.", ("method", "route"), QUERY_COUNT_BUCKETS
+)
+http_request_db_duration = Histogram(
+    "http_request_db_seconds", "Database time spent per request.", ("method", "route")
+)
+db_query_duration = Histogram(
+    "db_query_duration_seconds", "Duration of individual database statements.", ("operation",)
+)
+password_hash_duration = Histogram(
+    "password_hash_duration_seconds", "bcrypt hash/verify time, including pool wait.", ("operation",)
+)
+upstream_request_duration = Histogram(
+    "upstream_request_duration_seconds", "Round trips to external services, including retries.",
+    ("service", "operation"),
+)
+
+METRICS = [
+    http_requests,
+    http_request_duration,
+    http_request_db_queries,
+    http_request_db_duration,
+    db_query_duration,
+    password_hash_duration,
+    upstream_request_duration,
+]
+
+
+@dataclass
+class RequestStats:
+    db_queries: int = 0
+    db_seconds: float = 0.0
+    hash_seconds: float = 0.0
+    upstream_seconds: float = 0.0
+
+
+_current_request: contextvars.ContextVar[Optional[RequestStats]] = contextvars.ContextVar(
+    "current_request_stats", default=None
+)
+
+
+@contextmanager
+def timed(histogram: Histogram, *label_values: str, request_field: Optional[str] = None):
+    """Observe the duration of the block and add it to the current request's
+    ``request_field`` when called inside an instrumented request."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        histogram.observe(elapsed, *label_values)
+        stats = _current_request.get()
+        if request_field and stats is not None:
+            setattr(stats, request_field, getattr(stats, request_field) + elapsed)
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Time every statement run on ``engine`` and charge it to the current request."""
+
+    # The start time lives on the statement's execution context rather than
+    # the pooled connection, so a statement that fails (and never reaches
+    # after_cursor_execute) leaves nothing behind.
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context._query_started = time.perf_counter()
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._query_started
+        operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "OTHER"
+        db_query_duration.observe(elapsed, operation)
+        stats = _current_request.get()
+        if stats is not None:
+            stats.db_queries += 1
+            stats.db_seconds += elapsed
+
+
+# endpoint (or mounted app) -> route path, so labels stay bounded by the route table
+_route_paths = {}
+
+
+def route_path(scope) -> str:
+    endpoint = scope.get("endpoint")
+    if endpoint is None:
+        return "unmatched"
+    path = _route_paths.get(endpoint)
+    if path is None:
+        for route in scope["app"].routes:
+            _route_paths[getattr(route, "endpoint", None) or route.app] = route.path
+        path = _route_paths.get(endpoint, "unmatched")
+    return path
+
+
+class MetricsMiddleware:
+    """Records latency, status and database work per route.
+
+    Latency is measured until the last body chunk is sent, so background tasks
+    that run after the response do not count against the route. Requests slower
+    than ``slow_request_seconds`` (when non-zero) are logged with a breakdown.
+    """
+
+    def __init__(self, app, slow_request_seconds: float = 0.0):
+        self.app = app
+        self.slow_request_seconds = slow_request_seconds
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current_request.set(stats)
+        started = time.perf_counter()
+        finished = None
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal finished, status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                finished = time.perf_counter()
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_request.reset(token)
+            duration = (finished or time.perf_counter()) - started
+            method = scope["method"]
+            route = route_path(scope)
+            http_requests.inc(method, route, str(status_code))
+            http_request_duration.observe(duration, method, route)
+            http_request_db_queries.observe(stats.db_queries, method, route)
+            http_request_db_duration.observe(stats.db_seconds, method, route)
+            if self.slow_request_seconds and duration >= self.slow_request_seconds:
+                logger.warning(
+                    "Slow request: %s %s -> %s in %.3fs (db: %d queries, %.3fs; hashing: %.3fs; upstream: %.3fs)",
+                    method, route, status_code, duration,
+                    stats.db_queries, stats.db_seconds, stats.hash_seconds, stats.upstream_seconds,
+                )
+
+
+def render_stats(prefix: str, stats: dict) -> list:
+    """Expose the numeric values of a ``stats()`` dict as gauges."""
+    lines = []
+    for key, value in stats.items():
+        if isinstance(value, (int, float)):
+            name = f"{prefix}_{key}"
+            lines += [f"# TYPE {name} gauge", f"{name} {float(value)}"]
+    return lines
+
+
+def render(gauges: Optional[dict] = None) -> str:
+    lines = []
+    for metric in METRICS:
+        lines += metric.render()
+    for prefix, stats in (gauges or {}).items():
+        lines += render_stats(prefix, stats)
+    return "\n".join(lines) + "\n"
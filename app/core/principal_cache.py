@@ -0,0 +1,28 @@
+# app/core/principal_cache.py
+from typing import Optional
+from cachetools import TTLCache
+
+from app.core.config import settings
+from app.db.models.user import User
+
+# Detached User rows keyed by token ``sub`` (the email). Cached instances are
+# shared between requests and must be treated as read-only; anything that
+# writes a user loads its own row and calls ``invalidate_user`` once it is done,
+# whether or not the write committed.
+_principals = TTLCache(
+    maxsize=settings.PRINCIPAL_CACHE_SIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS or 1,
+)
+
+def get_cached_user(email: str) -> Optional[User]:
+    return _principals.get(email)
+
+def cache_user(user: User) -> None:
+    if settings.PRINCIPAL_CACHE_TTL_SECONDS > 0:
+        _principals[user.email] = user
+
+def invalidate_user(email: str) -> None:
+    _principals.pop(email, None)
+
+def stats() -> dict:
+    return {"entries": len(_principals), "maxsize": _principals.maxsize, "ttl": _principals.ttl}
@@ -0,0 +1,239 @@
+# app/core/profiler.py
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Optional
+
+from app.core.config import settings
+from app.core.metrics import route_path
+
+logger = logging.getLogger(__name__)
+
+# Top frames that mean the event loop is idle, waiting for I/O.
+IDLE_FRAMES = {("selectors.py", "select"), ("selectors.py", "poll")}
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def fold_stack(frame) -> str:
+    """Render a frame chain root-first as one ``a;b;c`` line, the input format
+    of flamegraph.pl and speedscope."""
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+def _is_idle(frame) -> bool:
+    return (os.path.basename(frame.f_code.co_filename), frame.f_code.co_name) in IDLE_FRAMES
+
+
+class StepTimer:
+    """Wraps a coroutine and measures how long each step runs on the event loop.
+
+    Every ``send``/``throw`` into the coroutine is synchronous work done on the
+    loop thread; the time between steps is spent suspended on awaited I/O (or
+    waiting for the loop). A long single step points at a blocking call.
+    """
+
+    def __init__(self, coro):
+        self.coro = coro
+        self.loop_seconds = 0.0
+        self.max_step_seconds = 0.0
+        self.steps = 0
+
+    def _charge(self, started: float) -> None:
+        elapsed = time.perf_counter() - started
+        self.loop_seconds += elapsed
+        self.max_step_seconds = max(self.max_step_seconds, elapsed)
+        self.steps += 1
+
+    def __await__(self):
+        value, error = None, None
+        while True:
+            started = time.perf_counter()
+            try:
+                if error is not None:
+                    yielded = self.coro.throw(error)
+                else:
+                    yielded = self.coro.send(value)
+            except StopIteration as stop:
+                self._charge(started)
+                return stop.value
+            except BaseException:
+                self._charge(started)
+                raise
+            self._charge(started)
+            try:
+                value, error = (yield yielded), None
+            except BaseException as exc:
+                value, error = None, exc
+
+
+class SamplingProfiler:
+    """Samples the event-loop thread's stack from a background thread.
+
+    A session runs for a fixed window; with ``sample_rate`` below 1 only that
+    fraction of requests is tracked and stacks are only recorded while one of
+    them is in flight. Tracked requests get a per-route split of time spent
+    running on the loop versus awaiting.
+    """
+
+    def __init__(self):
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._reset()
+
+    def _reset(self) -> None:
+        self.stacks = Counter()
+        self.routes = {}
+        self.samples = 0
+        self.idle_samples = 0
+        self.started_at: Optional[datetime] = None
+        self.ends_at: Optional[float] = None
+        self.interval = 0.0
+        self.sample_rate = 1.0
+        self.all_threads = False
+        self._loop_thread_id: Optional[int] = None
+        self._tracked_in_flight = 0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, seconds: float, interval: float, sample_rate: float, all_threads: bool) -> None:
+        if self.running:
+            raise RuntimeError("A profiling session is already running")
+        self._reset()
+        self.started_at = datetime.now(timezone.utc)
+        self.ends_at = time.monotonic() + seconds
+        self.interval = interval
+        self.sample_rate = sample_rate
+        self.all_threads = all_threads
+        # start() is called from a request handler, i.e. on the event-loop thread.
+        self._loop_thread_id = threading.get_ident()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            if time.monotonic() >= self.ends_at:
+                break
+            if self.sample_rate < 1 and not self._tracked_in_flight:
+                continue
+            frames = sys._current_frames()
+            if self.all_threads:
+                names = {thread.ident: thread.name for thread in threading.enumerate()}
+                targets = [(ident, frame) for ident, frame in frames.items() if ident != own_id]
+            else:
+                names = {}
+                targets = [(self._loop_thread_id, frames.get(self._loop_thread_id))]
+            for ident, frame in targets:
+                if frame is None:
+                    continue
+                self.samples += 1
+                if _is_idle(frame):
+                    self.idle_samples += 1
+                    continue
+                stack = fold_stack(frame)
+                if ident in names:
+                    stack = f"{names[ident]};{stack}"
+                self.stacks[stack] += 1
+        self._write_output()
+
+    def _write_output(self) -> None:
+        if not settings.PROFILER_OUTPUT_DIR or not self.stacks:
+            return
+        os.makedirs(settings.PROFILER_OUTPUT_DIR, exist_ok=True)
+        name = f"profile-{self.started_at:%Y%m%dT%H%M%S}.folded"
+        path = os.path.join(settings.PROFILER_OUTPUT_DIR, name)
+        with open(path, "w") as f:
+            f.write(self.folded())
+        logger.info("Wrote profile to %s", path)
+
+    def should_track(self) -> bool:
+        return self.running and (self.sample_rate >= 1 or random.random() < self.sample_rate)
+
+    def request_started(self) -> None:
+        self._tracked_in_flight += 1
+
+    def request_finished(self, route: str, total: float, timer: StepTimer) -> None:
+        self._tracked_in_flight = max(self._tracked_in_flight - 1, 0)
+        stats = self.routes.setdefault(route, {
+            "requests": 0,
+            "total_seconds": 0.0,
+            "loop_seconds": 0.0,
+            "awaited_seconds": 0.0,
+            "max_step_seconds": 0.0,
+        })
+        stats["requests"] += 1
+        stats["total_seconds"] += total
+        stats["loop_seconds"] += timer.loop_seconds
+        stats["awaited_seconds"] += max(total - timer.loop_seconds, 0.0)
+        stats["max_step_seconds"] = max(stats["max_step_seconds"], timer.max_step_seconds)
+
+    def folded(self) -> str:
+        # Copy first: the sampler thread may still be adding stacks.
+        stacks = Counter(dict(self.stacks))
+        return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+    def status(self) -> dict:
+        routes = {}
+        for route, stats in sorted(self.routes.items()):
+            total = stats["total_seconds"]
+            routes[route] = {
+                **stats,
+                "loop_share": stats["loop_seconds"] / total if total else 0.0,
+            }
+        return {
+            "running": self.running,
+            "started_at": self.started_at,
+            "remaining_seconds": max(self.ends_at - time.monotonic(), 0.0) if self.running else 0.0,
+            "interval_seconds": self.interval,
+            "sample_rate": self.sample_rate,
+            "all_threads": self.all_threads,
+            "samples": self.samples,
+            "idle_samples": self.idle_samples,
+            "distinct_stacks": len(self.stacks),
+            "routes": routes,
+        }
+
+
+profiler = SamplingProfiler()
+
+
+class ProfilerMiddleware:
+    """Times the loop/await split of requests picked by the active profiling
+    session; a no-op while no session is running."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not profiler.should_track():
+            await self.app(scope, receive, send)
+            return
+
+        profiler.request_started()
+        timer = StepTimer(self.app(scope, receive, send))
+        started = time.perf_counter()
+        try:
+            await timer
+        finally:
+            profiler.request_finished(route_path(scope), time.perf_counter() - started, timer)
@@ -0,0 +1,201 @@
+# app/core/rate_limit.py
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Optional
+from cachetools import LRUCache
+from fastapi import HTTPException, Request, status
+
+from app.core.config import settings
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+
+@dataclass(frozen=True)
+class Rate:
+    limit: int
+    period: float
+
+
+def parse_rate(value: str) -> Optional[Rate]:
+    """Parse ``"<count>/<second|minute|hour|day>"``; an empty string means no limit."""
+    if not value:
+        return None
+    count, _, unit = value.partition("/")
+    if unit not in PERIODS:
+        raise ValueError(f"Invalid rate limit: {value!r}")
+    return Rate(int(count), PERIODS[unit])
+
+
+class MemoryRateLimitBackend:
+    """Per-process limiter state. Each worker enforces its own budget, so the
+    effective limit is multiplied by the number of workers."""
+
+    def __init__(self, algorithm: str, max_keys: int = 100_000):
+        if algorithm not in ("token_bucket", "sliding_window"):
+            raise ValueError(f"Unknown rate limit algorithm: {algorithm}")
+        self.algorithm = algorithm
+        self._state = LRUCache(maxsize=max_keys)
+
+    async def hit(self, key: str, rate: Rate) -> float:
+        now = time.monotonic()
+        if self.algorithm == "token_bucket":
+            return self._token_bucket(key, rate, now)
+        return self._sliding_window(key, rate, now)
+
+    def _token_bucket(self, key: str, rate: Rate, now: float) -> float:
+        tokens, updated = self._state.get(key, (rate.limit, now))
+        tokens = min(rate.limit, tokens + (now - updated) * rate.limit / rate.period)
+        if tokens >= 1:
+            self._state[key] = (tokens - 1, now)
+            return 0
+        self._state[key] = (tokens, now)
+        return (1 - tokens) * rate.period / rate.limit
+
+    def _sliding_window(self, key: str, rate: Rate, now: float) -> float:
+        # Sliding window counter: the previous fixed window is weighted by how
+        # much of it still overlaps the sliding window.
+        window = int(now // rate.period)
+        elapsed = now - window * rate.period
+        current_window, current, previous = self._state.get(key, (window, 0, 0))
+        if current_window != window:
+            previous = current if current_window == window - 1 else 0
+            current = 0
+        if previous * (1 - elapsed / rate.period) + current + 1 > rate.limit:
+            self._state[key] = (window, current, previous)
+            return rate.period - elapsed
+        self._state[key] = (window, current + 1, previous)
+        return 0
+
+
+TOKEN_BUCKET_SCRIPT = """
+local limit = tonumber(ARGV[1])
+local period = tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or limit
+local ts = tonumber(state[2]) or now
+tokens = math.min(limit, tokens + (now - ts) * limit / period)
+local retry = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    retry = (1 - tokens) * period / limit
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(period * 1000))
+return tostring(retry)
+"""
+
+SLIDING_WINDOW_SCRIPT = """
+local limit = tonumber(ARGV[1])
+local period = tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local window = math.floor(now / period)
+local elapsed = now - window * period
+local current_key = KEYS[1] .. ':' .. window
+local current = tonumber(redis.call('GET', current_key) or '0')
+local previous = tonumber(redis.call('GET', KEYS[1] .. ':' .. (window - 1)) or '0')
+if previous * (1 - elapsed / period) + current + 1 > limit then
+    return tostring(period - elapsed)
+end
+redis.call('INCR', current_key)
+redis.call('PEXPIRE', current_key, math.ceil(period * 2000))
+return '0'
+"""
+
+
+class RedisRateLimitBackend:
+    """Limiter state shared by every worker through Redis; each check is a
+    single atomic script call. Requires the optional ``redis`` package."""
+
+    def __init__(self, url: str, algorithm: str, prefix: str = "ratelimit:"):
+        try:
+            import redis.asyncio as redis
+        except ImportError as exc:
+            raise RuntimeError("RATE_LIMIT_BACKEND=redis requires the 'redis' package") from exc
+        if algorithm == "token_bucket":
+            script = TOKEN_BUCKET_SCRIPT
+        elif algorithm == "sliding_window":
+            script = SLIDING_WINDOW_SCRIPT
+        else:
+            raise ValueError(f"Unknown rate limit algorithm: {algorithm}")
+        self.algorithm = algorithm
+        self.prefix = prefix
+        self._client = redis.from_url(url)
+        self._script = self._client.register_script(script)
+
+    async def hit(self, key: str, rate: Rate) -> float:
+        return float(await self._script(keys=[self.prefix + key], args=[rate.limit, rate.period]))
+
+
+def build_rate_limit_backend():
+    if settings.RATE_LIMIT_BACKEND == "memory":
+        return MemoryRateLimitBackend(settings.RATE_LIMIT_ALGORITHM)
+    if settings.RATE_LIMIT_BACKEND == "redis":
+        return RedisRateLimitBackend(settings.RATE_LIMIT_REDIS_URL, settings.RATE_LIMIT_ALGORITHM)
+    raise ValueError(f"Unknown RATE_LIMIT_BACKEND: {settings.RATE_LIMIT_BACKEND}")
+
+
+rate_limit_backend = build_rate_limit_backend()
+rejected_requests = Counter()
+
+
+async def _request_email(request: Request) -> Optional[str]:
+    # FastAPI has already read and cached the body by the time dependencies run.
+    content_type = request.headers.get("content-type", "")
+    try:
+        if content_type.startswith("application/json"):
+            body = await request.json()
+            value = body.get("email") if isinstance(body, dict) else None
+        elif content_type.startswith(("application/x-www-form-urlencoded", "multipart/form-data")):
+            form = await request.form()
+            value = form.get("username") or form.get("email")
+        else:
+            value = None
+    except ValueError:
+        return None
+    return value.strip().lower() if isinstance(value, str) else None
+
+
+class RateLimit:
+    """Dependency that rejects a request with 429 once the client IP or the
+    email in the request body exceeds its budget for ``scope``."""
+
+    def __init__(self, scope: str, per_ip: str = "", per_email: str = ""):
+        self.scope = scope
+        self.per_ip = parse_rate(per_ip)
+        self.per_email = parse_rate(per_email)
+
+    async def __call__(self, request: Request) -> None:
+        if not settings.RATE_LIMIT_ENABLED:
+            return
+
+        checks = []
+        if self.per_ip and request.client:
+            checks.append((f"{self.scope}:ip:{request.client.host}", self.per_ip))
+        if self.per_email:
+            email = await _request_email(request)
+            if email:
+                checks.append((f"{self.scope}:email:{email}", self.per_email))
+
+        for key, rate in checks:
+            retry_after = await rate_limit_backend.hit(key, rate)
+            if retry_after > 0:
+                rejected_requests[self.scope] += 1
+                raise HTTPException(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    detail="Too many requests, please try again later.",
+                    headers={"Retry-After": str(max(int(retry_after + 0.999), 1))},
+                )
+
+
+login_rate_limit = RateLimit(
+    "login", settings.RATE_LIMIT_LOGIN_PER_IP, settings.RATE_LIMIT_LOGIN_PER_EMAIL
+)
+otp_verify_rate_limit = RateLimit(
+    "otp_verify", settings.RATE_LIMIT_OTP_VERIFY_PER_IP, settings.RATE_LIMIT_OTP_VERIFY_PER_EMAIL
+)
+otp_send_rate_limit = RateLimit("otp_send", settings.RATE_LIMIT_OTP_SEND_PER_IP)
@@ -0,0 +1,223 @@
+# app/core/revocation.py
+import asyncio
+import hashlib
+import logging
+import math
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from cachetools import TLRUCache
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.core.config import settings
+from app.db.models.blacklisted_token import BlacklistedToken
+
+logger = logging.getLogger(__name__)
+
+# Re-read a little behind the last seen row so commits that landed out of
+# order with their server-side timestamps are not missed.
+SYNC_OVERLAP = timedelta(seconds=30)
+
+
+def revocation_key(token: str, claims: dict) -> str:
+    # Tokens issued before jti was added are keyed by a digest of the whole token.
+    return claims.get("jti") or hashlib.sha256(token.encode()).hexdigest()
+
+
+def _epoch(value: datetime) -> float:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+class BloomFilter:
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.size = max(int(-capacity * math.log(error_rate) / math.log(2) ** 2), 8)
+        self.hash_count = max(round(self.size / capacity * math.log(2)), 1)
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: str):
+        digest = hashlib.sha256(key.encode()).digest()
+        h1 = int.from_bytes(digest[:8], "big")
+        h2 = int.from_bytes(digest[8:16], "big") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def add(self, key: str) -> None:
+        for pos in self._positions(key):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+
+class _RevokedEntries(TLRUCache):
+    """Revocation key -> token ``exp``; entries drop out once the token has expired."""
+
+    overflowed = False
+
+    def popitem(self):
+        key, expires_at = super().popitem()
+        # Evicting a still-valid revocation means a miss no longer proves anything.
+        if expires_at > time.time():
+            self.overflowed = True
+        return key, expires_at
+
+
+class RevocationCache:
+    """Process-local view of ``blacklisted_tokens``.
+
+    ``is_revoked`` returns True or False when the cache can answer on its own
+    and None when the caller has to ask the database.  The cache is warmed from
+    the table at startup, written through on logout and periodically synced so
+    revocations made by other workers show up within ``REVOCATION_SYNC_SECONDS``.
+    """
+
+    backend = "memory"
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._reset()
+
+    def _reset(self) -> None:
+        self._entries = _RevokedEntries(
+            maxsize=self.maxsize,
+            ttu=lambda _key, expires_at, _now: expires_at,
+            timer=time.time,
+        )
+        self._warm = False
+        self._synced_until: Optional[datetime] = None
+
+    def _query(self):
+        return select(BlacklistedToken.jti, BlacklistedToken.expires_at, BlacklistedToken.blacklisted_at)
+
+    def _definitely_absent(self, key: str) -> bool:
+        return not self._entries.overflowed
+
+    def _needs_rebuild(self) -> bool:
+        return not self._warm
+
+    def is_revoked(self, key: str) -> Optional[bool]:
+        if key in self._entries:
+            return True
+        if self._warm and self._definitely_absent(key):
+            return False
+        return None
+
+    def add(self, key: str, expires_at: float) -> None:
+        if expires_at > time.time():
+            self._entries[key] = expires_at
+
+    def _load(self, rows) -> None:
+        for key, expires_at, blacklisted_at in rows:
+            self.add(key, _epoch(expires_at))
+            if blacklisted_at and (self._synced_until is None or blacklisted_at > self._synced_until):
+                self._synced_until = blacklisted_at
+
+    async def warm(self, db: AsyncSession) -> None:
+        self._reset()
+        result = await db.execute(
+            self._query().where(BlacklistedToken.expires_at > datetime.now(timezone.utc))
+        )
+        self._load(result)
+        self._warm = True
+
+    async def sync(self, db: AsyncSession) -> None:
+        if self._needs_rebuild():
+            await self.warm(db)
+            return
+
+        query = self._query()
+        if self._synced_until is not None:
+            query = query.where(BlacklistedToken.blacklisted_at > self._synced_until - SYNC_OVERLAP)
+        result = await db.execute(query)
+        self._load(result)
+
+    def stats(self) -> dict:
+        return {
+            "backend": self.backend,
+            "warm": self._warm,
+            "entries": len(self._entries),
+            "overflowed": self._entries.overflowed,
+        }
+
+
+class BloomRevocationCache(RevocationCache):
+    """Adds a Bloom filter over every revocation key so that misses stay
+    authoritative even after the LRU has evicted entries."""
+
+    backend = "bloom"
+
+    def __init__(self, maxsize: int, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        super().__init__(maxsize)
+
+    def _reset(self) -> None:
+        super()._reset()
+        self._bloom = BloomFilter(self.capacity, self.error_rate)
+
+    def _definitely_absent(self, key: str) -> bool:
+        return super()._definitely_absent(key) or key not in self._bloom
+
+    def _needs_rebuild(self) -> bool:
+        # The filter only ever fills up; rebuild it from the table once it is
+        # past capacity so the false-positive rate stays where it was sized.
+        return super()._needs_rebuild() or self._bloom.count > self.capacity
+
+    def add(self, key: str, expires_at: float) -> None:
+        self._bloom.add(key)
+        super().add(key, expires_at)
+
+    def stats(self) -> dict:
+        return {**super().stats(), "bloom_count": self._bloom.count, "bloom_capacity": self.capacity}
+
+
+class DatabaseRevocationCache(RevocationCache):
+    """No caching: every check goes to ``blacklisted_tokens``."""
+
+    backend = "database"
+
+    def is_revoked(self, key: str) -> Optional[bool]:
+        return None
+
+    def add(self, key: str, expires_at: float) -> None:
+        pass
+
+    async def warm(self, db: AsyncSession) -> None:
+        pass
+
+    async def sync(self, db: AsyncSession) -> None:
+        pass
+
+
+def build_revocation_cache() -> RevocationCache:
+    backend = settings.REVOCATION_BACKEND
+    if backend == "memory":
+        return RevocationCache(settings.REVOCATION_CACHE_SIZE)
+    if backend == "bloom":
+        return BloomRevocationCache(
+            settings.REVOCATION_CACHE_SIZE,
+            settings.REVOCATION_BLOOM_CAPACITY,
+            settings.REVOCATION_BLOOM_ERROR_RATE,
+        )
+    if backend == "database":
+        return DatabaseRevocationCache(0)
+    raise ValueError(f"Unknown REVOCATION_BACKEND: {backend}")
+
+
+revocation_cache = build_revocation_cache()
+
+
+async def run_revocation_sync(session_factory, interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            async with session_factory() as db:
+                await revocation_cache.sync(db)
+        except Exception:
+            logger.exception("Revocation cache sync failed")
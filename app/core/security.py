@@ -1,45 +1,104 @@
 # app/core/security.py
+import hashlib
+import secrets
 from jose import jwt, JWTError
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
 from fastapi import HTTPException, status, Depends
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
 from app.core.config import settings
+from app.core.keys import key_ring
 from app.db.models.user import User
 from app.db.models.blacklisted_token import BlacklistedToken
 from app.db.session import get_async_db
-from app.utils.hashing import hash_password, verify_password, validate_password_strength
+from app.core.revocation import revocation_cache, revocation_key
+from app.core.principal_cache import get_cached_user, cache_user
+from app.utils.hashing import (
+    hash_password,
+    verify_password,
+    hash_password_async,
+    verify_password_async,
+    password_needs_rehash,
+    validate_password_strength,
+)
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 def create_access_token(data: dict, expires_delta: timedelta = None) -> str:
     to_encode = data.copy()
     expire = datetime.utcnow() + (expires_delta or timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES))
-    to_encode.update({"exp": expire})
-    return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    to_encode.update({"exp": expire, "jti": uuid4().hex})
+    return key_ring.encode(to_encode)
+
+def create_refresh_token() -> tuple:
+    """Return an opaque refresh token and the digest stored in its place."""
+    token = secrets.token_urlsafe(32)
+    return token, hash_refresh_token(token)
+
+def hash_refresh_token(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+def build_blacklist_entry(token: str) -> BlacklistedToken:
+    # Only called with tokens get_current_user has already validated.
+    claims = jwt.get_unverified_claims(token)
+    return BlacklistedToken(
+        jti=revocation_key(token, claims),
+        expires_at=datetime.fromtimestamp(claims["exp"], tz=timezone.utc),
+    )
 
 async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)) -> User:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
     )
-    result = await db.execute(select(BlacklistedToken).filter_by(token=token))
-    if result.scalar_one_or_none():
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token has been revoked")
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        payload = key_ring.decode(token)
         email: str = payload.get("sub")
         if email is None:
             raise credentials_exception
     except JWTError:
         raise credentials_exception
+    # Tokens issued before token_version existed count as version 0.
+    token_version = payload.get("ver", 0)
 
-    result = await db.execute(select(User).filter_by(email=email))
-    user = result.scalar_one_or_none()
+    # With short-lived access tokens this is skipped and revocation is enforced
+    # when the refresh token is rotated instead.
+    if settings.ACCESS_TOKEN_REVOCATION_CHECK:
+        key = revocation_key(token, payload)
+        revoked = revocation_cache.is_revoked(key)
+        if revoked is None:
+            result = await db.execute(select(BlacklistedToken.id).filter_by(jti=key))
+            revoked = result.scalar_one_or_none() is not None
+            if revoked:
+                revocation_cache.add(key, payload["exp"])
+        if revoked:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token has been revoked")
 
-    if user is None:
-        raise credentials_exception
+    user = get_cached_user(email)
+    # A token newer than the cached row means the cache predates a bump made
+    # by this or another worker; reload rather than reject a valid token.
+    if user is None or user.token_version < token_version:
+        result = await db.execute(select(User).filter_by(email=email))
+        user = result.scalar_one_or_none()
 
+        if user is None:
+            raise credentials_exception
+
+        # Detach it before caching: the instance is shared with other requests,
+        # and a handler that writes the user must load its own copy instead of
+        # getting this one back from the session's identity map.
+        db.expunge(user)
+        cache_user(user)
+
+    if token_version < user.token_version:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token has been revoked")
     return user
+
+async def require_admin(current_user: User = Depends(get_current_user)) -> User:
+    admins = {email.lower() for email in settings.ADMIN_EMAILS}
+    if current_user.email.lower() not in admins:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin privileges required")
+    return current_user
@@ -0,0 +1,55 @@
+# app/core/startup.py
+import logging
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class StartupTracker:
+    """Per-phase startup timings and the readiness flag behind ``/readyz``.
+
+    Created when ``app.main`` starts importing, so the ``imports`` phase and
+    ``ready_after_seconds`` are measured from there. The worker accepts
+    requests as soon as the lifespan yields; it reports ready once the
+    background warm-up (DB pool, caches, bcrypt) has finished.
+    """
+
+    def __init__(self):
+        self.created = time.perf_counter()
+        self.phases = {}
+        self.ready = False
+        self.ready_after: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+    def record(self, name: str, seconds: float) -> None:
+        self.phases[name] = seconds
+        logger.info("Startup phase %s took %.3fs", name, seconds)
+
+    @contextmanager
+    def phase(self, name: str):
+        # Only phases that completed are recorded.
+        started = time.perf_counter()
+        yield
+        self.record(name, time.perf_counter() - started)
+
+    def mark_ready(self) -> None:
+        self.ready = True
+        self.last_error = None
+        self.ready_after = time.perf_counter() - self.created
+        logger.info("Ready %.3fs after import", self.ready_after)
+
+    def status(self, include_error: bool = False) -> dict:
+        status = {
+            "status": "ready" if self.ready else "starting",
+            "ready_after_seconds": self.ready_after,
+            "phases": dict(self.phases),
+        }
+        # Raw exception text (hosts, driver messages) is for admins, not probes.
+        if include_error:
+            status["last_error"] = self.last_error
+        return status
+
+
+startup = StartupTracker()
@@ -0,0 +1,10 @@
+# app/db/dialect.py
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+def upsert_insert(db: AsyncSession):
+    """Return the dialect's ``insert`` construct, which supports
+    ``on_conflict_do_update``/``on_conflict_do_nothing``."""
+    if db.get_bind().dialect.name == "sqlite":
+        return sqlite.insert
+    return postgresql.insert
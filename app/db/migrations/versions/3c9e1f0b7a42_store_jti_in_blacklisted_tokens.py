@@ -0,0 +1,90 @@
+"""Store jti and expiry instead of full tokens in blacklisted_tokens
+
+Revision ID: 3c9e1f0b7a42
+Revises: 15a138538dd7
+Create Date: 2026-10-18 09:12:40.118204
+
+"""
+import hashlib
+from datetime import datetime, timedelta, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from jose import jwt, JWTError
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c9e1f0b7a42'
+down_revision: Union[str, None] = '15a138538dd7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+
+blacklisted_tokens = sa.table(
+    'blacklisted_tokens',
+    sa.column('id', sa.Integer()),
+    sa.column('token', sa.String()),
+    sa.column('jti', sa.String()),
+    sa.column('expires_at', sa.DateTime(timezone=True)),
+    sa.column('blacklisted_at', sa.DateTime(timezone=True)),
+)
+
+
+def _revocation_entry(token, blacklisted_at):
+    try:
+        claims = jwt.get_unverified_claims(token)
+    except JWTError:
+        claims = {}
+    jti = claims.get('jti') or hashlib.sha256(token.encode()).hexdigest()
+    if claims.get('exp'):
+        expires_at = datetime.fromtimestamp(claims['exp'], tz=timezone.utc)
+    else:
+        # Unparseable tokens never authenticate; give them a day and let the reaper drop them.
+        expires_at = (blacklisted_at or datetime.now(timezone.utc)) + timedelta(days=1)
+    return jti, expires_at
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('blacklisted_tokens', sa.Column('jti', sa.String(length=64), nullable=True))
+    op.add_column('blacklisted_tokens', sa.Column('expires_at', sa.DateTime(timezone=True), nullable=True))
+
+    bind = op.get_bind()
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(blacklisted_tokens.c.id, blacklisted_tokens.c.token, blacklisted_tokens.c.blacklisted_at)
+            .where(blacklisted_tokens.c.id > last_id)
+            .order_by(blacklisted_tokens.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        for row_id, token, blacklisted_at in rows:
+            jti, expires_at = _revocation_entry(token, blacklisted_at)
+            bind.execute(
+                blacklisted_tokens.update()
+                .where(blacklisted_tokens.c.id == row_id)
+                .values(jti=jti, expires_at=expires_at)
+            )
+        last_id = rows[-1].id
+
+    op.alter_column('blacklisted_tokens', 'jti', nullable=False)
+    op.alter_column('blacklisted_tokens', 'expires_at', nullable=False)
+    op.create_index(op.f('ix_blacklisted_tokens_jti'), 'blacklisted_tokens', ['jti'], unique=True)
+    op.drop_column('blacklisted_tokens', 'token')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Full tokens cannot be recovered; old rows keep their jti/digest in the
+    # token column, so revocations recorded after the upgrade stop matching.
+    op.add_column('blacklisted_tokens', sa.Column('token', sa.String(), nullable=True))
+    op.execute(blacklisted_tokens.update().values(token=blacklisted_tokens.c.jti))
+    op.alter_column('blacklisted_tokens', 'token', nullable=False)
+    op.create_unique_constraint('blacklisted_tokens_token_key', 'blacklisted_tokens', ['token'])
+    op.drop_index(op.f('ix_blacklisted_tokens_jti'), table_name='blacklisted_tokens')
+    op.drop_column('blacklisted_tokens', 'expires_at')
+    op.drop_column('blacklisted_tokens', 'jti')
@@ -0,0 +1,30 @@
+"""Index expiry columns for the reaper
+
+Revision ID: 7d2a4c8e1b90
+Revises: 3c9e1f0b7a42
+Create Date: 2026-10-18 10:03:11.527391
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7d2a4c8e1b90'
+down_revision: Union[str, None] = '3c9e1f0b7a42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f('ix_otps_expires_at'), 'otps', ['expires_at'], unique=False)
+    op.create_index(op.f('ix_blacklisted_tokens_expires_at'), 'blacklisted_tokens', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_blacklisted_tokens_expires_at'), table_name='blacklisted_tokens')
+    op.drop_index(op.f('ix_otps_expires_at'), table_name='otps')
@@ -0,0 +1,28 @@
+"""Add token_version to users
+
+Revision ID: a7e4c2d9b6f1
+Revises: f2d8b61c4a3e
+Create Date: 2026-10-18 15:21:09.304117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7e4c2d9b6f1'
+down_revision: Union[str, None] = 'f2d8b61c4a3e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('token_version', sa.Integer(), server_default=sa.text('0'), nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('users', 'token_version')
@@ -0,0 +1,40 @@
+"""Unique OTP per email and purpose
+
+Revision ID: a81f5d3e6c27
+Revises: 7d2a4c8e1b90
+Create Date: 2026-10-18 10:41:26.904117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a81f5d3e6c27'
+down_revision: Union[str, None] = '7d2a4c8e1b90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Keep only the newest OTP for each (email, purpose) before adding the key.
+    op.execute(
+        """
+        DELETE FROM otps a
+        USING otps b
+        WHERE a.email = b.email
+          AND a.purpose = b.purpose
+          AND (a.created_at, a.id) < (b.created_at, b.id)
+        """
+    )
+    op.drop_index('ix_otp_email_purpose_created', table_name='otps')
+    op.create_unique_constraint('uq_otp_email_purpose', 'otps', ['email', 'purpose'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('uq_otp_email_purpose', 'otps', type_='unique')
+    op.create_index('ix_otp_email_purpose_created', 'otps', ['email', 'purpose', 'created_at'], unique=False)
@@ -0,0 +1,28 @@
+"""Add profile_picture_variants to users
+
+Revision ID: c4b7e92d1f05
+Revises: a81f5d3e6c27
+Create Date: 2026-10-18 11:27:52.310448
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4b7e92d1f05'
+down_revision: Union[str, None] = 'a81f5d3e6c27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('profile_picture_variants', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('users', 'profile_picture_variants')
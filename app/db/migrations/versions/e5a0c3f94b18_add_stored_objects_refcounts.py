@@ -0,0 +1,59 @@
+"""Add stored_objects reference counts
+
+Revision ID: e5a0c3f94b18
+Revises: c4b7e92d1f05
+Create Date: 2026-10-18 12:15:03.772160
+
+"""
+import re
+from collections import Counter
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a0c3f94b18'
+down_revision: Union[str, None] = 'c4b7e92d1f05'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# uuid4().hex and content-hash names written by the upload endpoint
+STORED_KEY = re.compile(r"^[0-9a-f]{32}\.(jpg|png|webp)$")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    stored_objects = op.create_table('stored_objects',
+    sa.Column('key', sa.String(length=128), nullable=False),
+    sa.Column('refcount', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('key')
+    )
+
+    # Count references held by existing users so their files are collected
+    # correctly the next time they change pictures.
+    users = sa.table(
+        'users',
+        sa.column('profile_picture', sa.String()),
+        sa.column('profile_picture_variants', sa.JSON()),
+    )
+    counts = Counter()
+    rows = op.get_bind().execute(
+        sa.select(users.c.profile_picture, users.c.profile_picture_variants)
+        .where(users.c.profile_picture.isnot(None))
+    )
+    for picture, variants in rows:
+        urls = [picture] + [variant['url'] for variant in variants or []]
+        for url in urls:
+            key = url.rstrip('/').split('/')[-1]
+            if STORED_KEY.match(key):
+                counts[key] += 1
+    if counts:
+        op.bulk_insert(stored_objects, [{'key': key, 'refcount': count} for key, count in counts.items()])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('stored_objects')
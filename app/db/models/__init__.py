@@ -2,5 +2,7 @@
 from app.db.models.user import User
 from app.db.models.otp import OTP
 from app.db.models.blacklisted_token import BlacklistedToken
+from app.db.models.stored_object import StoredObject
+from app.db.models.refresh_token import RefreshToken
 
-__all__ = ["User", "OTP", "BlacklistedToken"]
+__all__ = ["User", "OTP", "BlacklistedToken", "StoredObject", "RefreshToken"]
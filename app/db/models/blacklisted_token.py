@@ -5,5 +5,7 @@ class BlacklistedToken(Base):
     __tablename__ = "blacklisted_tokens"
 
     id = Column(Integer, primary_key=True, index=True)
-    token = Column(String, unique=True, nullable=False)
-    blacklisted_at = Column(DateTime(timezone=True), server_default=func.now())
\ No newline at end of file
+    # The token's ``jti`` claim, or the SHA-256 hex digest of tokens issued without one.
+    jti = Column(String(64), unique=True, index=True, nullable=False)
+    expires_at = Column(DateTime(timezone=True), index=True, nullable=False)
+    blacklisted_at = Column(DateTime(timezone=True), server_default=func.now())
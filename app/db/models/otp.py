@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, DateTime, func, Index
+from sqlalchemy import Column, String, Integer, DateTime, func, UniqueConstraint
 from app.db.base import Base
 
 class OTP(Base):
@@ -8,9 +8,9 @@ class OTP(Base):
     email = Column(String, index=True, nullable=False)
     otp = Column(String)
     purpose = Column(String)  # 'verify_email' or 'reset_password'
-    expires_at = Column(DateTime)
+    expires_at = Column(DateTime, index=True)
     created_at = Column(DateTime, server_default=func.now(), nullable=False)
 
     __table_args__ = (
-        Index("ix_otp_email_purpose_created", "email", "purpose", "created_at"),
+        UniqueConstraint("email", "purpose", name="uq_otp_email_purpose"),
     )
@@ -0,0 +1,10 @@
+from sqlalchemy import Column, Integer, String, DateTime, func
+from app.db.base import Base
+
+class StoredObject(Base):
+    __tablename__ = "stored_objects"
+
+    # Content-addressed storage key, e.g. "<sha256 prefix>.webp"
+    key = Column(String(128), primary_key=True)
+    refcount = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Boolean, DateTime, text, func
+from sqlalchemy import Column, String, Integer, Boolean, DateTime, JSON, text, func
 from app.db.base import Base
 
 class User(Base):
@@ -11,4 +11,9 @@ class User(Base):
     is_verified = Column(Boolean, default=False, server_default=text('false'))
     signed_up_via_google = Column(Boolean, default=False, server_default=text('false'), nullable=False)
     created_at = Column(DateTime, server_default=func.now(), nullable=False)
-    profile_picture = Column(String, nullable=True)
\ No newline at end of file
+    # Embedded in access tokens as ``ver``; bumping it invalidates every token
+    # issued before, without listing them in the blacklist.
+    token_version = Column(Integer, default=0, server_default=text('0'), nullable=False)
+    profile_picture = Column(String, nullable=True)
+    # [{"size": 48, "format": "webp", "url": ...}, ...] rendered from an uploaded picture
+    profile_picture_variants = Column(JSON, nullable=True)
\ No newline at end of file
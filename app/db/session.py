@@ -1,11 +1,133 @@
 # app/db/session.py
+import asyncio
+import time
+from sqlalchemy import exc, text
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from app.core.config import settings
 
-async_engine = create_async_engine(settings.ASYNC_DATABASE_URL, echo=False, future=True)
+# Baselines for DB_POOL_PRESET; any DB_* setting that is set explicitly wins.
+POOL_PRESETS = {
+    "default": {},
+    "production": {
+        "pool_size": 10,
+        "max_overflow": 5,
+        "pool_timeout": 10,
+        "pool_recycle": 1800,
+        "pool_pre_ping": True,
+    },
+    # Transaction-pooling PgBouncer cannot keep prepared statements across transactions.
+    "pgbouncer": {
+        "pool_size": 10,
+        "max_overflow": 0,
+        "pool_timeout": 10,
+        "pool_recycle": 300,
+        "pool_pre_ping": True,
+        "statement_cache_size": 0,
+        "prepared_statement_cache_size": 0,
+    },
+}
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long callers wait for a connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            self.checkouts += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+
+
+def pool_options() -> dict:
+    """The ``DB_POOL_PRESET`` with any explicit ``DB_*`` overrides applied."""
+    if settings.DB_POOL_PRESET not in POOL_PRESETS:
+        raise ValueError(f"Unknown DB_POOL_PRESET: {settings.DB_POOL_PRESET}")
+    config = dict(POOL_PRESETS[settings.DB_POOL_PRESET])
+    overrides = {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        "prepared_statement_cache_size": settings.DB_PREPARED_STATEMENT_CACHE_SIZE,
+    }
+    config.update({key: value for key, value in overrides.items() if value is not None})
+    return config
+
+
+def build_engine_options() -> dict:
+    config = pool_options()
+
+    # asyncpg's own statement cache and SQLAlchemy's prepared statement cache
+    # are driver connect arguments rather than engine options.
+    connect_args = {}
+    for key in ("statement_cache_size", "prepared_statement_cache_size"):
+        if key in config:
+            value = config.pop(key)
+            if "+asyncpg" in settings.ASYNC_DATABASE_URL:
+                connect_args[key] = value
+
+    options = {"echo": False, "future": True, **config}
+    if connect_args:
+        options["connect_args"] = connect_args
+    if ":memory:" not in settings.ASYNC_DATABASE_URL:
+        options["poolclass"] = InstrumentedQueuePool
+    return options
+
+
+async_engine = create_async_engine(settings.ASYNC_DATABASE_URL, **build_engine_options())
 AsyncSessionLocal = sessionmaker(bind=async_engine, class_=AsyncSession, expire_on_commit=False)
 
 async def get_async_db():
     async with AsyncSessionLocal() as session:
         yield session
+
+async def warm_pool() -> int:
+    """Open the pool's steady-state connections up front so the first requests
+    do not pay for connecting. Returns how many were opened."""
+    pool = async_engine.pool
+    connections = pool.size() if isinstance(pool, AsyncAdaptedQueuePool) else 1
+
+    async def ping():
+        async with async_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    # Held concurrently, so the pool has to open a distinct connection for each.
+    await asyncio.gather(*(ping() for _ in range(connections)))
+    return connections
+
+def get_pool_stats() -> dict:
+    pool = async_engine.pool
+    stats = {"pool": type(pool).__name__}
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        stats.update({
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow(),
+        })
+    if isinstance(pool, InstrumentedQueuePool):
+        stats.update({
+            "checkouts": pool.checkouts,
+            "timeouts": pool.timeouts,
+            "wait_seconds_total": pool.wait_total,
+            "wait_seconds_max": pool.wait_max,
+        })
+    return stats
@@ -1,16 +1,130 @@
-import os
+# Imported first so the "imports" startup phase covers everything below.
+from app.core.startup import startup
+
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
 from app.api.v1.auth import endpoints as auth_endpoints
 from app.api.v1.user import endpoints as user_endpoints
+from app.api.v1.ops import endpoints as ops_endpoints
+from app.api.v1.admin import endpoints as admin_endpoints
+from app.core.assets import ImmutableStaticFiles
+from app.core.body_limit import MULTIPART_OVERHEAD_BYTES, RequestBodyLimitMiddleware
+from app.core.config import settings
+from app.core.google_oauth import google_client
+from app.core.metrics import MetricsMiddleware, instrument_engine
+from app.core.profiler import ProfilerMiddleware, profiler
+from app.core.revocation import revocation_cache, run_revocation_sync
+from app.db.session import AsyncSessionLocal, async_engine, warm_pool
+from app.services.reaper import run_reaper
+from app.services.email_service import email_dispatcher
+from app.services.storage import storage
+from app.utils import hashing
+from app.utils.hashing import configure_password_hashing, hashing_pool
+from app.utils.images import image_pool
+
+logger = logging.getLogger(__name__)
+
+
+async def warm_password_hashing() -> None:
+    # Also loads the bcrypt backend, so the first login does not pay for it.
+    # A failed calibration must not leave the worker unready forever, so it
+    # falls back to the current (passlib default) work factor instead.
+    try:
+        with startup.phase("bcrypt"):
+            rounds = await configure_password_hashing()
+    except Exception as exc:
+        startup.last_error = f"{type(exc).__name__}: {exc}"
+        logger.exception(
+            "bcrypt calibration failed; hashing new passwords with %d rounds", hashing.bcrypt_rounds
+        )
+        return
+    logger.info("Hashing new passwords with %d bcrypt rounds", rounds)
+
+
+async def warm_database() -> None:
+    # Retried until the database is reachable; the worker stays unready meanwhile.
+    while True:
+        try:
+            with startup.phase("db_pool"):
+                connections = await warm_pool()
+            logger.info("Opened %d database connections", connections)
+            with startup.phase("revocation_cache"):
+                async with AsyncSessionLocal() as db:
+                    await revocation_cache.warm(db)
+            return
+        except Exception as exc:
+            startup.last_error = f"{type(exc).__name__}: {exc}"
+            logger.exception("Database warm-up failed; retrying in %ss", settings.STARTUP_WARMUP_RETRY_SECONDS)
+            await asyncio.sleep(settings.STARTUP_WARMUP_RETRY_SECONDS)
+
+
+async def warm_up() -> None:
+    """Runs after the worker starts accepting requests; /readyz reports ready
+    once everything here has succeeded."""
+    with startup.phase("warm_up"):
+        await asyncio.gather(warm_password_hashing(), warm_database())
+    startup.mark_ready()
 
-app = FastAPI()
 
-# Ensure the directory exists
-os.makedirs("profile_pictures", exist_ok=True)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    with startup.phase("lifespan"):
+        storage.ensure_ready()
+        await email_dispatcher.start()
 
-# Mount static file route
-app.mount("/profile_pictures", StaticFiles(directory="profile_pictures"), name="profile_pictures")
+        tasks = [asyncio.create_task(warm_up())]
+        if settings.REVOCATION_SYNC_SECONDS > 0:
+            tasks.append(asyncio.create_task(
+                run_revocation_sync(AsyncSessionLocal, settings.REVOCATION_SYNC_SECONDS)
+            ))
+        if settings.REAPER_INTERVAL_SECONDS > 0:
+            tasks.append(asyncio.create_task(
+                run_reaper(AsyncSessionLocal, settings.REAPER_INTERVAL_SECONDS)
+            ))
+
+    yield
+
+    for task in tasks:
+        task.cancel()
+    profiler.stop()
+    await email_dispatcher.stop()
+    hashing_pool.shutdown(wait=False)
+    image_pool.shutdown(wait=False)
+    await google_client.aclose()
+    await async_engine.dispose()
+
+
+app = FastAPI(lifespan=lifespan)
+
+# Oversized uploads are cut off while they stream in, before multipart parsing.
+app.add_middleware(
+    RequestBodyLimitMiddleware,
+    limits={("PATCH", "/user/profile"): settings.PROFILE_PICTURE_MAX_BYTES + MULTIPART_OVERHEAD_BYTES},
+)
+if settings.METRICS_ENABLED:
+    instrument_engine(async_engine)
+    app.add_middleware(MetricsMiddleware, slow_request_seconds=settings.SLOW_REQUEST_SECONDS)
+if settings.PROFILER_ENABLED:
+    app.add_middleware(ProfilerMiddleware)
+
+# Mount static file route; the directory is created in the lifespan.
+app.mount(
+    "/profile_pictures",
+    ImmutableStaticFiles(
+        directory=storage.serve_directory,
+        check_dir=False,
+        max_age=settings.PROFILE_PICTURE_CACHE_MAX_AGE,
+        precompressed=settings.PROFILE_PICTURE_PRECOMPRESSED,
+    ),
+    name="profile_pictures",
+)
 
 app.include_router(auth_endpoints.router, tags=["Auth"])
 app.include_router(user_endpoints.router, tags=["Users"])
+app.include_router(ops_endpoints.router, tags=["Ops"])
+app.include_router(admin_endpoints.router, tags=["Admin"])
+
+startup.record("imports", time.perf_counter() - startup.created)
@@ -0,0 +1,179 @@
+# app/serve.py
+"""Production entry point.
+
+    python -m app.serve
+    python -m app.serve --workers 4 --max-requests 10000 --max-requests-jitter 1000
+
+Runs uvicorn with one worker process per available CPU unless told otherwise,
+using uvloop and httptools when they are installed. Per-worker limits are
+derived from the settings before the workers start: ``DB_MAX_CONNECTIONS`` is
+split into fixed per-worker pools, and the hashing/image pools get an equal
+share of the cores instead of one thread per core in every worker.
+
+On SIGTERM each worker stops accepting connections, finishes in-flight
+requests (up to ``--graceful-timeout``) and then runs the app's shutdown,
+which closes its database connections. With ``--shutdown-delay`` it first
+keeps serving for that long while ``/readyz`` reports 503, so a load balancer
+can take it out of rotation before connections are refused.
+"""
+import argparse
+import copy
+import importlib.util
+import logging
+import os
+import random
+import signal
+import threading
+
+import uvicorn
+from uvicorn.config import LOGGING_CONFIG
+from uvicorn.supervisors import Multiprocess
+
+from app.core.config import settings
+from app.core.startup import startup
+
+# Named explicitly: under "python -m" this module runs as __main__.
+logger = logging.getLogger("app.serve")
+
+
+def available_cpus() -> int:
+    # Respects CPU affinity (e.g. container cpusets), which os.cpu_count() ignores.
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0)) or 1
+    return os.cpu_count() or 1
+
+
+def select_implementations() -> tuple:
+    loop = "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+    http = "httptools" if importlib.util.find_spec("httptools") else "h11"
+    return loop, http
+
+
+def worker_limits(workers: int, cpus: int) -> dict:
+    limits = {}
+    if settings.DB_MAX_CONNECTIONS > 0:
+        # No overflow, so workers * pool size never exceeds the budget.
+        limits["DB_POOL_SIZE"] = max(settings.DB_MAX_CONNECTIONS // workers, 1)
+        limits["DB_MAX_OVERFLOW"] = 0
+    threads = max(cpus // workers, 1)
+    if settings.HASH_POOL_WORKERS == 0:
+        limits["HASH_POOL_WORKERS"] = threads
+    if settings.IMAGE_POOL_WORKERS == 0:
+        limits["IMAGE_POOL_WORKERS"] = threads
+    return limits
+
+
+def connections_per_worker() -> int:
+    # Imported here: app.db.session creates the engine from the settings on
+    # import, so it must not be loaded before apply_worker_limits has run.
+    from app.db.session import pool_options
+
+    options = pool_options()
+    # SQLAlchemy's QueuePool defaults when the preset does not size the pool.
+    return options.get("pool_size", 5) + options.get("max_overflow", 10)
+
+
+def apply_worker_limits(limits: dict) -> None:
+    for key, value in limits.items():
+        # Spawned workers read the environment; a single in-process worker
+        # reuses the settings object that is already loaded.
+        os.environ[key] = str(value)
+        setattr(settings, key, value)
+
+
+def build_log_config(level: str) -> dict:
+    # uvicorn's logging setup, plus the app's own loggers (startup phases, etc.).
+    config = copy.deepcopy(LOGGING_CONFIG)
+    config["loggers"]["app"] = {"handlers": ["default"], "level": level.upper(), "propagate": False}
+    return config
+
+
+class GracefulServer(uvicorn.Server):
+    """uvicorn server with staggered recycling and a pre-shutdown delay."""
+
+    def __init__(self, config: uvicorn.Config, max_requests_jitter: int = 0, shutdown_delay: float = 0.0):
+        super().__init__(config)
+        self.max_requests_jitter = max_requests_jitter
+        self.shutdown_delay = shutdown_delay
+        self._draining = False
+
+    def run(self, sockets=None) -> None:
+        # Runs in the worker process, so each worker draws its own limit and
+        # they do not all recycle at the same moment.
+        if self.config.limit_max_requests and self.max_requests_jitter:
+            self.config.limit_max_requests += random.randint(0, self.max_requests_jitter)
+        super().run(sockets)
+
+    def handle_exit(self, sig, frame) -> None:
+        # A worker can get SIGTERM twice (from the supervisor and from a
+        # process-group kill); only the first starts the delay. SIGINT still
+        # exits straight away.
+        if sig == signal.SIGTERM and self.shutdown_delay > 0:
+            if not self._draining:
+                self._draining = True
+                startup.ready = False
+                logger.info("Received SIGTERM; shutting down in %.1fs", self.shutdown_delay)
+                timer = threading.Timer(self.shutdown_delay, super().handle_exit, (sig, frame))
+                timer.daemon = True
+                timer.start()
+            return
+        super().handle_exit(sig, frame)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the API with uvicorn worker processes.")
+    parser.add_argument("--host", default=settings.SERVER_HOST)
+    parser.add_argument("--port", type=int, default=settings.SERVER_PORT)
+    parser.add_argument("--workers", type=int, default=settings.SERVER_WORKERS,
+                        help="worker processes (0 = one per available CPU)")
+    parser.add_argument("--max-requests", type=int, default=settings.SERVER_MAX_REQUESTS,
+                        help="restart a worker after this many requests (0 = never)")
+    parser.add_argument("--max-requests-jitter", type=int, default=settings.SERVER_MAX_REQUESTS_JITTER,
+                        help="add up to this many requests to each worker's limit")
+    parser.add_argument("--graceful-timeout", type=float, default=settings.SERVER_GRACEFUL_TIMEOUT_SECONDS,
+                        help="seconds to wait for in-flight requests on shutdown")
+    parser.add_argument("--shutdown-delay", type=float, default=settings.SERVER_SHUTDOWN_DELAY_SECONDS,
+                        help="seconds to keep serving, unready, after SIGTERM")
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+
+    cpus = available_cpus()
+    workers = args.workers or cpus
+    limits = worker_limits(workers, cpus)
+    apply_worker_limits(limits)
+    loop, http = select_implementations()
+
+    config = uvicorn.Config(
+        "app.main:app",
+        host=args.host,
+        port=args.port,
+        workers=workers,
+        loop=loop,
+        http=http,
+        lifespan="on",
+        limit_max_requests=args.max_requests or None,
+        timeout_graceful_shutdown=args.graceful_timeout or None,
+        log_config=build_log_config(args.log_level),
+        log_level=args.log_level,
+    )
+    logger.info(
+        "Starting %d worker(s) on %d CPU(s) with %s/%s; per-worker limits: %s",
+        workers, cpus, loop, http, limits or "defaults",
+    )
+    if workers > 1 and settings.DB_MAX_CONNECTIONS <= 0:
+        per_worker = connections_per_worker()
+        logger.warning(
+            "DB_MAX_CONNECTIONS is not set: %d workers may open up to %d database "
+            "connections (%d each); set it to the database's budget to split it across workers",
+            workers, workers * per_worker, per_worker,
+        )
+    server = GracefulServer(config, args.max_requests_jitter, args.shutdown_delay)
+    if workers > 1:
+        sock = config.bind_socket()
+        Multiprocess(config, target=server.run, sockets=[sock]).run()
+    else:
+        server.run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,397 @@
+# app/services/bulk_users.py
+"""Bulk user import and export.
+
+    python -m app.services.bulk_users import users.csv --batch-size 5000
+    python -m app.services.bulk_users export users.jsonl --include-password-hashes
+
+Import rows need an ``email`` and take ``name``, ``hashed_password`` (a
+passlib/bcrypt hash from another system), ``password`` (plaintext, hashed on a
+process pool), ``is_verified`` and ``signed_up_via_google``. Existing users
+are only updated in the columns the input provides; a changed password hash
+bumps their token_version and revokes their refresh tokens, as a reset would.
+Rows whose ``hashed_password`` is not a hash passlib can verify are rejected.
+On asyncpg new users are loaded with COPY into a staging table and inserted
+with a single INSERT ... SELECT; other drivers use executemany.
+"""
+import argparse
+import asyncio
+import csv
+import json
+import logging
+import os
+import sys
+import time
+from datetime import datetime, timezone
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, Optional
+
+from sqlalchemy import Boolean, Integer, String, bindparam, func, text, update
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.core.config import settings
+from app.db.dialect import upsert_insert
+from app.db.models.refresh_token import RefreshToken
+from app.db.models.user import User
+from app.db.session import AsyncSessionLocal, async_engine
+from app.utils.hashing import bcrypt_rounds, hash_password, pwd_context
+
+logger = logging.getLogger(__name__)
+
+IMPORT_COLUMNS = ("name", "email", "hashed_password", "is_verified", "signed_up_via_google")
+EXPORT_COLUMNS = ("id", "name", "email", "is_verified", "signed_up_via_google", "created_at", "profile_picture")
+TRUE_VALUES = {"1", "true", "t", "yes", "y"}
+# Emails per existing-user lookup; keeps IN lists under driver parameter limits.
+LOOKUP_CHUNK = 1000
+
+STAGING_TABLE = "user_import_staging"
+CREATE_STAGING = f"""
+CREATE TEMPORARY TABLE IF NOT EXISTS {STAGING_TABLE} (
+    name TEXT NOT NULL,
+    email TEXT NOT NULL,
+    hashed_password TEXT NOT NULL,
+    is_verified BOOLEAN NOT NULL,
+    signed_up_via_google BOOLEAN NOT NULL
+) ON COMMIT DELETE ROWS
+"""
+
+
+def _detect_format(path: str, fmt: Optional[str]) -> str:
+    if fmt:
+        return fmt
+    return "jsonl" if path.endswith((".jsonl", ".ndjson")) else "csv"
+
+
+def _to_bool(value) -> bool:
+    if isinstance(value, bool):
+        return value
+    return str(value or "").strip().lower() in TRUE_VALUES
+
+
+def _optional_bool(value) -> Optional[bool]:
+    # Missing or blank means "keep the current value" for existing users.
+    if value is None or (isinstance(value, str) and not value.strip()):
+        return None
+    return _to_bool(value)
+
+
+def _is_valid_hash(hashed: str) -> bool:
+    # A value passlib cannot parse would make verify() raise at login.
+    scheme = pwd_context.identify(hashed)
+    if not scheme:
+        return False
+    try:
+        pwd_context.handler(scheme).from_string(hashed)
+    except ValueError:
+        return False
+    return True
+
+
+def read_rows(path: str, fmt: str) -> Iterator[dict]:
+    with open(path, newline="") as f:
+        if fmt == "csv":
+            yield from csv.DictReader(f)
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def _batches(rows: Iterator[dict], size: int) -> Iterator[list]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def prepare_batch(rows: list, executor: Optional[ProcessPoolExecutor], rounds: int, workers: int = 1) -> tuple:
+    """Normalise a batch and hash plaintext passwords. Returns (rows, rejected)."""
+    prepared = {}
+    rejected = 0
+    to_hash = []
+    for row in rows:
+        email = (row.get("email") or "").strip()
+        hashed = row.get("hashed_password") or None
+        if not email or (hashed is not None and not _is_valid_hash(str(hashed))):
+            rejected += 1
+            continue
+        # None marks a column the input does not provide.
+        record = {
+            "name": (row.get("name") or "").strip() or None,
+            "email": email,
+            "hashed_password": hashed,
+            "is_verified": _optional_bool(row.get("is_verified")),
+            "signed_up_via_google": _optional_bool(row.get("signed_up_via_google")),
+        }
+        if record["hashed_password"] is None and row.get("password"):
+            to_hash.append((record, row["password"]))
+        # Last occurrence wins; one batch touches each user once.
+        prepared[email] = record
+
+    if to_hash:
+        passwords = [password for _, password in to_hash]
+        if executor is None:
+            hashes = [hash_password(password, rounds) for password in passwords]
+        else:
+            chunksize = max(1, len(passwords) // (workers * 4))
+            hashes = executor.map(hash_password, passwords, [rounds] * len(passwords), chunksize=chunksize)
+        for (record, _), hashed in zip(to_hash, hashes):
+            record["hashed_password"] = hashed
+    return list(prepared.values()), rejected
+
+
+def _new_user(record: dict) -> dict:
+    # Defaults only ever apply to users that do not exist yet.
+    return {
+        "name": record["name"] or record["email"].split("@")[0],
+        "email": record["email"],
+        # No hash means password login is unavailable (as for Google users).
+        "hashed_password": record["hashed_password"] or "",
+        "is_verified": bool(record["is_verified"]),
+        "signed_up_via_google": bool(record["signed_up_via_google"]),
+    }
+
+
+# executemany over existing users: provided columns win, missing ones (NULL) keep
+# the stored value.
+UPDATE_EXISTING = (
+    update(User)
+    .where(User.id == bindparam("b_id"))
+    .values(
+        name=func.coalesce(bindparam("b_name", type_=String), User.name),
+        hashed_password=func.coalesce(bindparam("b_hashed_password", type_=String), User.hashed_password),
+        is_verified=func.coalesce(bindparam("b_is_verified", type_=Boolean), User.is_verified),
+        signed_up_via_google=func.coalesce(
+            bindparam("b_signed_up_via_google", type_=Boolean), User.signed_up_via_google
+        ),
+        token_version=User.token_version + bindparam("b_bump", type_=Integer),
+    )
+)
+
+
+def _uses_asyncpg(db: AsyncSession) -> bool:
+    return db.get_bind().dialect.driver == "asyncpg"
+
+
+async def _existing_users(db: AsyncSession, emails: list) -> dict:
+    existing = {}
+    for start in range(0, len(emails), LOOKUP_CHUNK):
+        result = await db.execute(
+            select(User.id, User.email, User.hashed_password).where(User.email.in_(emails[start:start + LOOKUP_CHUNK]))
+        )
+        existing.update({email: (user_id, hashed) for user_id, email, hashed in result})
+    return existing
+
+
+async def _copy_batch(db: AsyncSession, rows: list) -> None:
+    # CREATE runs through SQLAlchemy first so the COPY below happens inside
+    # the same transaction; ON COMMIT DELETE ROWS empties it for the next batch.
+    await db.execute(text(CREATE_STAGING))
+    connection = await db.connection()
+    raw = await connection.get_raw_connection()
+    await raw.driver_connection.copy_records_to_table(
+        STAGING_TABLE,
+        records=[tuple(row[column] for column in IMPORT_COLUMNS) for row in rows],
+        columns=IMPORT_COLUMNS,
+    )
+    staging = text(f"SELECT {', '.join(IMPORT_COLUMNS)} FROM {STAGING_TABLE}").columns(
+        *(getattr(User, column) for column in IMPORT_COLUMNS)
+    ).subquery()
+    insert_stmt = postgresql.insert(User).from_select(list(IMPORT_COLUMNS), select(staging))
+    # A user registered since the lookup is left alone rather than failing the batch.
+    await db.execute(insert_stmt.on_conflict_do_nothing(index_elements=["email"]))
+
+
+async def _insert_batch(db: AsyncSession, rows: list) -> None:
+    await db.execute(upsert_insert(db)(User).on_conflict_do_nothing(index_elements=["email"]), rows)
+
+
+async def write_batch(db: AsyncSession, rows: list, on_conflict: str) -> tuple:
+    """Insert new users and, with ``on_conflict="update"``, update existing ones.
+    Returns (created, updated)."""
+    existing = await _existing_users(db, [row["email"] for row in rows])
+    new_users = [_new_user(row) for row in rows if row["email"] not in existing]
+    if new_users:
+        if _uses_asyncpg(db):
+            await _copy_batch(db, new_users)
+        else:
+            await _insert_batch(db, new_users)
+
+    updates = []
+    changed_passwords = []
+    if on_conflict == "update":
+        for row in rows:
+            if row["email"] not in existing:
+                continue
+            user_id, current_hash = existing[row["email"]]
+            bump = int(row["hashed_password"] is not None and row["hashed_password"] != current_hash)
+            if bump:
+                changed_passwords.append(user_id)
+            updates.append({
+                "b_id": user_id,
+                "b_name": row["name"],
+                "b_hashed_password": row["hashed_password"],
+                "b_is_verified": row["is_verified"],
+                "b_signed_up_via_google": row["signed_up_via_google"],
+                "b_bump": bump,
+            })
+    if updates:
+        # Core executemany; the ORM would treat a parameter list as a bulk
+        # update by primary key and reject the custom WHERE.
+        connection = await db.connection()
+        await connection.execute(UPDATE_EXISTING, updates)
+    for start in range(0, len(changed_passwords), LOOKUP_CHUNK):
+        await db.execute(
+            update(RefreshToken)
+            .where(
+                RefreshToken.user_id.in_(changed_passwords[start:start + LOOKUP_CHUNK]),
+                RefreshToken.revoked_at.is_(None),
+            )
+            .values(revoked_at=datetime.now(timezone.utc))
+        )
+    await db.commit()
+    return len(new_users), len(updates)
+
+
+async def import_users(
+    path: str,
+    fmt: Optional[str] = None,
+    batch_size: int = 5000,
+    workers: int = 0,
+    rounds: Optional[int] = None,
+    on_conflict: str = "update",
+) -> dict:
+    fmt = _detect_format(path, fmt)
+    rounds = rounds or settings.BCRYPT_ROUNDS or bcrypt_rounds
+    loop = asyncio.get_running_loop()
+    workers = workers or os.cpu_count() or 1
+    executor = ProcessPoolExecutor(max_workers=workers)
+    stats = {"rows": 0, "created": 0, "updated": 0, "rejected": 0}
+    started = time.perf_counter()
+
+    async def write(prepared: list, rows_read: int) -> None:
+        created, updated = await write_batch(db, prepared, on_conflict)
+        stats["created"] += created
+        stats["updated"] += updated
+        _report("Imported", rows_read, started)
+
+    try:
+        async with AsyncSessionLocal() as db:
+            pending = None
+            try:
+                for batch in _batches(read_rows(path, fmt), batch_size):
+                    # Hash the next batch while the previous one is being written.
+                    prepared, rejected = await loop.run_in_executor(
+                        None, prepare_batch, batch, executor, rounds, workers
+                    )
+                    if pending is not None:
+                        await pending
+                    stats["rows"] += len(batch)
+                    stats["rejected"] += rejected
+                    pending = asyncio.create_task(write(prepared, stats["rows"]))
+            finally:
+                if pending is not None:
+                    await pending
+    finally:
+        executor.shutdown()
+    stats["seconds"] = time.perf_counter() - started
+    return stats
+
+
+def _report(verb: str, count: int, started: float) -> None:
+    elapsed = time.perf_counter() - started
+    logger.info("%s %d rows (%.0f rows/s)", verb, count, count / elapsed if elapsed else 0)
+
+
+def _export_value(value):
+    return value.isoformat() if hasattr(value, "isoformat") else value
+
+
+async def export_users(
+    path: str,
+    fmt: Optional[str] = None,
+    batch_size: int = 5000,
+    include_password_hashes: bool = False,
+) -> dict:
+    fmt = _detect_format(path, fmt)
+    columns = list(EXPORT_COLUMNS)
+    if include_password_hashes:
+        columns.insert(3, "hashed_password")
+    started = time.perf_counter()
+    count = 0
+
+    async with AsyncSessionLocal() as db:
+        if fmt == "csv" and _uses_asyncpg(db):
+            # Let the server stream CSV straight into the file.
+            connection = await db.connection()
+            raw = await connection.get_raw_connection()
+            status = await raw.driver_connection.copy_from_query(
+                f"SELECT {', '.join(columns)} FROM users ORDER BY id",
+                output=path,
+                format="csv",
+                header=True,
+            )
+            count = int(status.split()[-1])
+            _report("Exported", count, started)
+            return {"rows": count, "seconds": time.perf_counter() - started}
+
+        query = select(*(getattr(User, column) for column in columns)).order_by(User.id)
+        result = await db.stream(query.execution_options(yield_per=batch_size))
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f) if fmt == "csv" else None
+            if writer:
+                writer.writerow(columns)
+            async for partition in result.partitions():
+                for row in partition:
+                    values = [_export_value(value) for value in row]
+                    if writer:
+                        writer.writerow(values)
+                    else:
+                        f.write(json.dumps(dict(zip(columns, values))) + "\n")
+                count += len(partition)
+                _report("Exported", count, started)
+    return {"rows": count, "seconds": time.perf_counter() - started}
+
+
+async def _main(args) -> None:
+    if args.command == "import":
+        stats = await import_users(
+            args.path, args.format, args.batch_size, args.workers, args.rounds, args.on_conflict
+        )
+        print(
+            f"Imported {stats['rows']} rows in {stats['seconds']:.1f}s: {stats['created']} users created, "
+            f"{stats['updated']} updated, {stats['rejected']} rejected"
+        )
+    else:
+        stats = await export_users(args.path, args.format, args.batch_size, args.include_password_hashes)
+        print(f"Exported {stats['rows']} users in {stats['seconds']:.1f}s")
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk import or export users.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    importer = commands.add_parser("import", help="load users from CSV or JSONL")
+    importer.add_argument("path")
+    importer.add_argument("--format", choices=("csv", "jsonl"), help="default: from the file extension")
+    importer.add_argument("--batch-size", type=int, default=5000)
+    importer.add_argument("--workers", type=int, default=0, help="bcrypt processes (0 = one per core)")
+    importer.add_argument("--rounds", type=int, help="bcrypt rounds for plaintext passwords")
+    importer.add_argument("--on-conflict", choices=("update", "skip"), default="update",
+                          help="what to do with emails that already exist")
+
+    exporter = commands.add_parser("export", help="write users to CSV or JSONL")
+    exporter.add_argument("path")
+    exporter.add_argument("--format", choices=("csv", "jsonl"), help="default: from the file extension")
+    exporter.add_argument("--batch-size", type=int, default=5000)
+    exporter.add_argument("--include-password-hashes", action="store_true")
+
+    logging.basicConfig(format="%(message)s", stream=sys.stderr)
+    logger.setLevel(logging.INFO)
+    asyncio.run(_main(parser.parse_args()))
@@ -0,0 +1,211 @@
+# app/services/email_dispatcher.py
+import asyncio
+import logging
+import os
+import smtplib
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from email.message import EmailMessage as MIMEMessage
+from typing import List, Optional
+from uuid import uuid4
+from fastapi import HTTPException, status
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class EmailMessage:
+    sender: str
+    to: str
+    subject: str
+    body: str
+    enqueued_at: float = field(default_factory=time.monotonic)
+    attempts: int = 0
+
+    def to_mime(self) -> MIMEMessage:
+        mime = MIMEMessage()
+        mime["From"] = self.sender
+        mime["To"] = self.to
+        mime["Subject"] = self.subject
+        mime.set_content(self.body)
+        return mime
+
+
+class EmailTransport:
+    """Delivers a batch of messages, raising if any of them could not be sent."""
+
+    async def send_batch(self, messages: List[EmailMessage]) -> None:
+        raise NotImplementedError
+
+
+class SMTPTransport(EmailTransport):
+    """Sends each batch over a single SMTP connection (e.g. a local
+    ``python -m aiosmtpd -n -l localhost:1025`` stand-in)."""
+
+    def __init__(self, host: str, port: int, timeout: float = 10.0):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+
+    def _send(self, messages: List[EmailMessage]) -> None:
+        with smtplib.SMTP(self.host, self.port, timeout=self.timeout) as smtp:
+            for message in messages:
+                smtp.send_message(message.to_mime())
+
+    async def send_batch(self, messages: List[EmailMessage]) -> None:
+        await asyncio.to_thread(self._send, messages)
+
+
+class SpoolTransport(EmailTransport):
+    """Writes every message to ``<directory>/<uuid>.eml``."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def _write(self, messages: List[EmailMessage]) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        for message in messages:
+            path = os.path.join(self.directory, f"{uuid4().hex}.eml")
+            with open(path, "wb") as fh:
+                fh.write(message.to_mime().as_bytes())
+
+    async def send_batch(self, messages: List[EmailMessage]) -> None:
+        await asyncio.to_thread(self._write, messages)
+
+
+class EmailDispatcher:
+    """Bounded in-memory queue drained by background workers.
+
+    Workers pull up to ``batch_size`` messages at a time and hand them to the
+    transport.  A failed batch is retried with exponential backoff; messages
+    that still fail after ``max_retries`` attempts are moved to the
+    dead-letter buffer and logged.
+    """
+
+    def __init__(
+        self,
+        transport: EmailTransport,
+        max_queue: int = 1000,
+        workers: int = 2,
+        batch_size: int = 20,
+        max_retries: int = 3,
+        retry_backoff: float = 1.0,
+        dead_letter_size: int = 1000,
+    ):
+        self.transport = transport
+        self.max_queue = max_queue
+        self.workers = workers
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.dead_letters: deque = deque(maxlen=dead_letter_size)
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._retrying = 0
+        self._sent = 0
+        self._failed_batches = 0
+        self._dead_lettered = 0
+        self._latency_total = 0.0
+        self._latency_max = 0.0
+
+    @property
+    def queue(self) -> asyncio.Queue:
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queue)
+        return self._queue
+
+    def ensure_capacity(self) -> None:
+        """Reject a request up front, before it persists anything, when the
+        queue has no room for the email it is about to send."""
+        if self.queue.full():
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Email service is busy, please retry shortly.",
+                headers={"Retry-After": "5"},
+            )
+
+    def enqueue(self, message: EmailMessage) -> bool:
+        """Queue ``message`` for delivery; returns False if the queue filled
+        up since ``ensure_capacity`` was checked and the message was dropped."""
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self._dead_letter(message)
+            return False
+        return True
+
+    async def start(self) -> None:
+        for _ in range(self.workers):
+            self._tasks.append(asyncio.create_task(self._worker()))
+
+    async def stop(self, drain_timeout: float = 10.0) -> None:
+        if self._tasks:
+            try:
+                await asyncio.wait_for(self.queue.join(), timeout=drain_timeout)
+            except asyncio.TimeoutError:
+                logger.warning("Stopping email dispatcher with %d undelivered messages", self.queue.qsize())
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+
+    async def _worker(self) -> None:
+        while True:
+            batch = [await self.queue.get()]
+            while len(batch) < self.batch_size and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+            try:
+                await self._deliver(batch)
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+    async def _deliver(self, batch: List[EmailMessage]) -> None:
+        try:
+            await self.transport.send_batch(batch)
+        except Exception:
+            self._failed_batches += 1
+            logger.exception("Email delivery failed for a batch of %d", len(batch))
+            for message in batch:
+                self._retry_or_dead_letter(message)
+            return
+
+        now = time.monotonic()
+        for message in batch:
+            latency = now - message.enqueued_at
+            self._sent += 1
+            self._latency_total += latency
+            self._latency_max = max(self._latency_max, latency)
+
+    def _retry_or_dead_letter(self, message: EmailMessage) -> None:
+        message.attempts += 1
+        if message.attempts > self.max_retries:
+            self._dead_letter(message)
+            return
+        delay = self.retry_backoff * 2 ** (message.attempts - 1)
+        self._retrying += 1
+        asyncio.get_running_loop().call_later(delay, self._requeue, message)
+
+    def _requeue(self, message: EmailMessage) -> None:
+        self._retrying -= 1
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self._dead_letter(message)
+
+    def _dead_letter(self, message: EmailMessage) -> None:
+        self._dead_lettered += 1
+        self.dead_letters.append(message)
+        logger.error("Dead-lettered email to %s after %d attempts", message.to, message.attempts)
+
+    def stats(self) -> dict:
+        return {
+            "queue_depth": self.queue.qsize(),
+            "max_queue": self.max_queue,
+            "retrying": self._retrying,
+            "sent": self._sent,
+            "failed_batches": self._failed_batches,
+            "dead_lettered": self._dead_lettered,
+            "delivery_latency_seconds_total": self._latency_total,
+            "delivery_latency_seconds_max": self._latency_max,
+        }
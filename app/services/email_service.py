@@ -0,0 +1,52 @@
+from app.core.config import settings
+from app.services.email_dispatcher import EmailDispatcher, EmailMessage, SMTPTransport, SpoolTransport
+from app.services.mock_email_service import MockEmailTransport
+
+def build_transport():
+    transport = settings.EMAIL_TRANSPORT
+    if transport == "mock":
+        return MockEmailTransport()
+    if transport == "smtp":
+        return SMTPTransport(settings.EMAIL_SMTP_HOST, settings.EMAIL_SMTP_PORT)
+    if transport == "spool":
+        return SpoolTransport(settings.EMAIL_SPOOL_DIR)
+    raise ValueError(f"Unknown EMAIL_TRANSPORT: {transport}")
+
+email_dispatcher = EmailDispatcher(
+    build_transport(),
+    max_queue=settings.EMAIL_QUEUE_SIZE,
+    workers=settings.EMAIL_WORKERS,
+    batch_size=settings.EMAIL_BATCH_SIZE,
+    max_retries=settings.EMAIL_MAX_RETRIES,
+)
+
+def build_otp_email(to_email: str, otp: str, purpose: str, name: str = "User") -> EmailMessage:
+    subject = {
+        "verify_email": "Verify Your Email Address",
+        "reset_password": "Reset Your Password"
+    }.get(purpose, "Your OTP Code")
+
+    body = f"""
+    Hi {name},
+
+    Here is your One-Time Password (OTP) to {purpose.replace('_', ' ')}: **{otp}**
+
+    Please use this code within the next {settings.OTP_LIFETIME_MINUTES} minutes.
+
+    If you didn’t request this, you can safely ignore this email.
+
+    Best regards,  
+    {settings.MAIL_SENDER}
+    """
+
+    return EmailMessage(sender=settings.MAIL_SENDER, to=to_email, subject=subject, body=body)
+
+def require_email_capacity():
+    # Checked before the endpoint commits anything, so a busy queue is a clean 503.
+    email_dispatcher.ensure_capacity()
+
+def send_otp_email(to_email: str, otp: str, purpose: str, name: str = "User") -> bool:
+    # Returns as soon as the message is queued; delivery happens in the background.
+    # Never raises: the OTP is already stored, so if the queue filled up in the
+    # meantime the message is dead-lettered and the user can ask for a resend.
+    return email_dispatcher.enqueue(build_otp_email(to_email, otp, purpose, name))
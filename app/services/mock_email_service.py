@@ -1,27 +1,15 @@
-from app.core.config import settings
-
-def send_mock_email(to_email: str, otp: str, purpose: str, name: str = "User"):
-    subject = {
-        "verify_email": "Verify Your Email Address",
-        "reset_password": "Reset Your Password"
-    }.get(purpose, "Your OTP Code")
-
-    message = f"""
-    From: {settings.MAIL_SENDER}
-    To: {to_email}
-    Subject: {subject}
-
-    Hi {name},
-
-    Here is your One-Time Password (OTP) to {purpose.replace('_', ' ')}: **{otp}**
-
-    Please use this code within the next {settings.OTP_LIFETIME_MINUTES} minutes.
-
-    If you didn’t request this, you can safely ignore this email.
-
-    Best regards,  
-    {settings.MAIL_SENDER}
-    """
+import asyncio
+from typing import List
+from app.services.email_dispatcher import EmailMessage, EmailTransport
 
+def print_mock_email(message: EmailMessage):
     print("[MOCK EMAIL]")
-    print(message)
+    print(f"""
+    From: {message.sender}
+    To: {message.to}
+    Subject: {message.subject}
+{message.body}""")
+
+class MockEmailTransport(EmailTransport):
+    async def send_batch(self, messages: List[EmailMessage]) -> None:
+        await asyncio.to_thread(lambda: [print_mock_email(message) for message in messages])
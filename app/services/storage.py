@@ -0,0 +1,216 @@
+# app/services/storage.py
+import json
+import os
+from collections import Counter
+from datetime import datetime, timezone
+from typing import List, Optional
+from uuid import uuid4
+import anyio
+from sqlalchemy import delete, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.core.config import settings
+from app.db.dialect import upsert_insert
+from app.db.models.stored_object import StoredObject
+from app.db.session import AsyncSessionLocal
+
+
+def content_key(digest: str, ext: str) -> str:
+    return f"{digest[:32]}.{ext}"
+
+
+def _remove_quietly(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+class LocalFileSystemStorage:
+    """Flat directory of content-addressed files, served by the app's static mount."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    @property
+    def serve_directory(self) -> str:
+        return self.directory
+
+    def _path(self, key: str) -> str:
+        if not key or os.path.basename(key) != key or key.startswith("."):
+            raise ValueError(f"Invalid storage key: {key!r}")
+        return os.path.join(self.directory, key)
+
+    def ensure_ready(self) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+
+    def temp_path(self) -> str:
+        # Same directory as the final objects so the rename into place is atomic.
+        return os.path.join(self.directory, f".{uuid4().hex}.part")
+
+    def _move_into_place(self, source_path: str, key: str, content_type: Optional[str]) -> None:
+        path = self._path(key)
+        if os.path.exists(path):
+            # Identical content is already stored; nothing to write.
+            _remove_quietly(source_path)
+        else:
+            os.replace(source_path, path)
+
+    def _write(self, key: str, data: bytes, content_type: Optional[str]) -> None:
+        if os.path.exists(self._path(key)):
+            return
+        temp_path = self.temp_path()
+        with open(temp_path, "wb") as fh:
+            fh.write(data)
+        self._move_into_place(temp_path, key, content_type)
+
+    def _delete(self, key: str) -> None:
+        _remove_quietly(self._path(key))
+
+    async def put_file(self, key: str, source_path: str, content_type: Optional[str] = None) -> None:
+        await anyio.to_thread.run_sync(self._move_into_place, source_path, key, content_type)
+
+    async def put_bytes(self, key: str, data: bytes, content_type: Optional[str] = None) -> None:
+        await anyio.to_thread.run_sync(self._write, key, data, content_type)
+
+    async def delete(self, key: str) -> None:
+        await anyio.to_thread.run_sync(self._delete, key)
+
+    async def discard_temp(self, temp_path: str) -> None:
+        await anyio.to_thread.run_sync(_remove_quietly, temp_path)
+
+
+class LocalObjectStorage(LocalFileSystemStorage):
+    """Local stand-in for an S3-style object store: objects live under
+    ``<root>/<bucket>/`` with a JSON metadata record per object under
+    ``<root>/.meta/<bucket>/``."""
+
+    def __init__(self, root: str, bucket: str):
+        super().__init__(os.path.join(root, bucket))
+        self.meta_directory = os.path.join(root, ".meta", bucket)
+
+    def ensure_ready(self) -> None:
+        super().ensure_ready()
+        os.makedirs(self.meta_directory, exist_ok=True)
+
+    def _meta_path(self, key: str) -> str:
+        return os.path.join(self.meta_directory, f"{key}.json")
+
+    def _move_into_place(self, source_path: str, key: str, content_type: Optional[str]) -> None:
+        size = os.path.getsize(source_path)
+        super()._move_into_place(source_path, key, content_type)
+        meta_path = self._meta_path(key)
+        if not os.path.exists(meta_path):
+            with open(meta_path, "w") as fh:
+                json.dump({
+                    "key": key,
+                    "size": size,
+                    "content_type": content_type,
+                    "created_at": datetime.now(timezone.utc).isoformat(),
+                }, fh)
+
+    def _delete(self, key: str) -> None:
+        super()._delete(key)
+        _remove_quietly(self._meta_path(key))
+
+
+def build_storage():
+    if settings.STORAGE_BACKEND == "local":
+        return LocalFileSystemStorage(settings.STORAGE_LOCAL_DIR)
+    if settings.STORAGE_BACKEND == "object":
+        return LocalObjectStorage(settings.STORAGE_OBJECT_ROOT, settings.STORAGE_OBJECT_BUCKET)
+    raise ValueError(f"Unknown STORAGE_BACKEND: {settings.STORAGE_BACKEND}")
+
+
+storage = build_storage()
+
+
+def profile_picture_keys(user) -> List[str]:
+    """Storage keys referenced by a user's picture and its variants.
+
+    Keys are the last path segment of our picture URLs; external URLs (e.g.
+    Google avatars) have no stored object and release as no-ops.
+    """
+    urls = [user.profile_picture] if user.profile_picture else []
+    urls += [variant["url"] for variant in user.profile_picture_variants or []]
+    return [url.rstrip("/").split("/")[-1] for url in urls]
+
+
+async def acquire_objects(db: AsyncSession, keys: List[str]) -> None:
+    """Add one reference per occurrence of each key (in the caller's transaction)."""
+    counts = Counter(keys)
+    if not counts:
+        return
+    insert = upsert_insert(db)
+    stmt = insert(StoredObject).values([{"key": key, "refcount": count} for key, count in counts.items()])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[StoredObject.key],
+        set_={"refcount": StoredObject.refcount + stmt.excluded.refcount},
+    )
+    await db.execute(stmt)
+
+
+async def release_objects(db: AsyncSession, keys: List[str]) -> List[str]:
+    """Drop references (in the caller's transaction) and return the keys that
+    are no longer referenced; their files can be deleted after commit."""
+    unreferenced = []
+    for key, count in Counter(keys).items():
+        result = await db.execute(
+            update(StoredObject)
+            .where(StoredObject.key == key)
+            .values(refcount=StoredObject.refcount - count)
+            .returning(StoredObject.refcount)
+        )
+        remaining = result.scalar_one_or_none()
+        if remaining is not None and remaining <= 0:
+            unreferenced.append(key)
+    if unreferenced:
+        await db.execute(
+            delete(StoredObject).where(StoredObject.key.in_(unreferenced), StoredObject.refcount <= 0)
+        )
+    return unreferenced
+
+
+async def delete_unreferenced(keys: List[str]) -> None:
+    """Delete the files of ``keys`` that are still unreferenced.
+
+    Each key is claimed with a refcount-0 tombstone row, locked while the
+    count is re-checked and the file deleted. A concurrent ``reserve_objects``
+    of the same key waits on that row, so it cannot take a reference (and
+    skip writing the file because it still exists) until the delete is done.
+    """
+    async with AsyncSessionLocal() as db:
+        insert = upsert_insert(db)
+        for key in keys:
+            await db.execute(
+                insert(StoredObject)
+                .values(key=key, refcount=0)
+                .on_conflict_do_nothing(index_elements=[StoredObject.key])
+            )
+            result = await db.execute(
+                select(StoredObject.refcount).where(StoredObject.key == key).with_for_update()
+            )
+            if result.scalar_one() <= 0:
+                await storage.delete(key)
+                await db.execute(delete(StoredObject).where(StoredObject.key == key))
+            await db.commit()
+
+
+async def reserve_objects(keys: List[str]) -> None:
+    """Take references on ``keys`` in a transaction of their own, before the
+    files are written or reused, so a concurrent ``delete_unreferenced`` sees
+    them as live. The caller's row update then owns these references; if it
+    never commits, hand them back with ``abandon_objects``."""
+    async with AsyncSessionLocal() as db:
+        await acquire_objects(db, keys)
+        await db.commit()
+
+
+async def abandon_objects(keys: List[str]) -> None:
+    """Undo ``reserve_objects`` and delete any file that is no longer referenced."""
+    async with AsyncSessionLocal() as db:
+        unreferenced = await release_objects(db, keys)
+        await db.commit()
+    if unreferenced:
+        await delete_unreferenced(unreferenced)
@@ -1,16 +1,79 @@
 # app/utils/hashing.py
+import math
 import re
+import time
+from typing import Optional
 from passlib.context import CryptContext
 from fastapi import HTTPException, status
 
+from app.core.config import settings
+from app.core.metrics import password_hash_duration, timed
+from app.utils.worker_pool import BoundedWorkerPool
+
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+_bcrypt = pwd_context.handler("bcrypt")
+
+# Rounds used for new hashes on this worker. Passed to the pool explicitly so
+# process workers, which have their own pwd_context, hash with the same cost.
+bcrypt_rounds: int = _bcrypt.default_rounds
+
+# bcrypt releases the GIL, so a thread pool already spreads hashing across cores.
+hashing_pool = BoundedWorkerPool(
+    "hashing",
+    kind=settings.HASH_POOL_KIND,
+    max_workers=settings.HASH_POOL_WORKERS,
+    max_queue=settings.HASH_POOL_MAX_QUEUE,
+)
+
+def set_bcrypt_rounds(rounds: int) -> None:
+    # Raising min_rounds makes needs_update flag every weaker hash for rehashing.
+    global bcrypt_rounds
+    pwd_context.update(bcrypt__default_rounds=rounds, bcrypt__min_rounds=rounds)
+    bcrypt_rounds = rounds
+
+def calibrate_bcrypt_rounds(target_seconds: float, min_rounds: int, max_rounds: int) -> int:
+    """Highest rounds whose hash time stays within ``target_seconds`` on one core."""
+    hasher = _bcrypt.using(rounds=min_rounds)
+    elapsed = float("inf")
+    for _ in range(3):
+        started = time.perf_counter()
+        hasher.hash("calibration")
+        elapsed = min(elapsed, time.perf_counter() - started)
+    # Every extra round doubles the cost, so one measurement is enough to extrapolate.
+    rounds = min_rounds + math.floor(math.log2(target_seconds / elapsed))
+    return max(min_rounds, min(max_rounds, rounds))
 
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+async def configure_password_hashing() -> int:
+    if settings.BCRYPT_ROUNDS:
+        set_bcrypt_rounds(settings.BCRYPT_ROUNDS)
+    elif settings.BCRYPT_TARGET_MS > 0:
+        set_bcrypt_rounds(await hashing_pool.run(
+            calibrate_bcrypt_rounds,
+            settings.BCRYPT_TARGET_MS / 1000,
+            settings.BCRYPT_MIN_ROUNDS,
+            settings.BCRYPT_MAX_ROUNDS,
+        ))
+    return bcrypt_rounds
+
+def hash_password(password: str, rounds: Optional[int] = None) -> str:
+    if rounds is None:
+        return pwd_context.hash(password)
+    return _bcrypt.using(rounds=rounds).hash(password)
 
 def verify_password(password: str, hashed: str) -> bool:
     return pwd_context.verify(password, hashed)
 
+async def hash_password_async(password: str) -> str:
+    with timed(password_hash_duration, "hash", request_field="hash_seconds"):
+        return await hashing_pool.run(hash_password, password, bcrypt_rounds)
+
+async def verify_password_async(password: str, hashed: str) -> bool:
+    with timed(password_hash_duration, "verify", request_field="hash_seconds"):
+        return await hashing_pool.run(verify_password, password, hashed)
+
+def password_needs_rehash(hashed: str) -> bool:
+    return pwd_context.needs_update(hashed)
+
 def validate_password_strength(password: str) -> None:
     if len(password) < 8:
         raise HTTPException(
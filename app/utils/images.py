@@ -0,0 +1,77 @@
+# app/utils/images.py
+import io
+from typing import List
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+from app.utils.worker_pool import BoundedWorkerPool
+
+PIL_FORMATS = {"webp": "WEBP", "jpeg": "JPEG"}
+FILE_EXTENSIONS = {"webp": "webp", "jpeg": "jpg"}
+
+image_pool = BoundedWorkerPool(
+    "images",
+    kind=settings.IMAGE_POOL_KIND,
+    max_workers=settings.IMAGE_POOL_WORKERS,
+    max_queue=settings.IMAGE_POOL_MAX_QUEUE,
+)
+
+
+class InvalidImageError(ValueError):
+    """Raised in the worker for uploads Pillow cannot decode. A plain
+    exception, so it survives the trip back from a process pool; the
+    caller turns it into the 400."""
+
+
+# Pillow is imported inside the worker functions: only uploads need it, and
+# keeping it off the import path shortens worker startup.
+
+def _encode(image, fmt: str) -> bytes:
+    if fmt == "jpeg" and image.mode != "RGB":
+        image = image.convert("RGB")
+    buffer = io.BytesIO()
+    # Re-encoding without passing exif/icc/xmp strips the original metadata.
+    image.save(buffer, PIL_FORMATS[fmt], quality=85, optimize=fmt == "jpeg")
+    return buffer.getvalue()
+
+
+def render_variants(source_path: str, sizes: List[int], formats: List[str]) -> List[dict]:
+    """Render square thumbnails of ``source_path`` in every size and format
+    and return their encoded bytes.  Runs in a worker; never call it on the
+    event loop."""
+    from PIL import Image, ImageOps, UnidentifiedImageError
+
+    try:
+        with Image.open(source_path) as original:
+            image = ImageOps.exif_transpose(original)
+            if image.mode not in ("RGB", "RGBA"):
+                image = image.convert("RGBA" if "transparency" in image.info else "RGB")
+
+            variants = []
+            for size in sizes:
+                thumbnail = ImageOps.fit(image, (size, size), Image.Resampling.LANCZOS)
+                for fmt in formats:
+                    variants.append({
+                        "size": size,
+                        "format": fmt,
+                        "ext": FILE_EXTENSIONS[fmt],
+                        "data": _encode(thumbnail, fmt),
+                    })
+            return variants
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError) as exc:
+        raise InvalidImageError(str(exc))
+
+
+async def render_variants_async(source_path: str) -> List[dict]:
+    try:
+        return await image_pool.run(
+            render_variants,
+            source_path,
+            settings.PROFILE_PICTURE_VARIANT_SIZES,
+            settings.PROFILE_PICTURE_VARIANT_FORMATS,
+        )
+    except InvalidImageError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Could not process the uploaded image.",
+        )
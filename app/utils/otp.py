@@ -5,46 +5,50 @@ from fastapi import HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
+from app.db.dialect import upsert_insert
 from app.db.models.otp import OTP
 from app.core.config import settings
 
 def generate_otp() -> str:
     return str(random.randint(100000, 999999))
 
-def create_otp(email: str, purpose: str) -> OTP:
+async def send_otp(db: AsyncSession, email: str, purpose: str) -> OTP:
     now = datetime.utcnow()
-    return OTP(
+    cooldown_start = now - timedelta(seconds=settings.RESEND_COOLDOWN_SECONDS)
+
+    # One row per (email, purpose): insert it, or replace it only when the
+    # previous OTP is past its cooldown. Concurrent resends serialize on the
+    # unique key, so at most one of them wins.
+    insert = upsert_insert(db)
+    stmt = insert(OTP).values(
         email=email,
         otp=generate_otp(),
         purpose=purpose,
         created_at=now,
-        expires_at=now + timedelta(minutes=settings.OTP_LIFETIME_MINUTES)
-    )
-
-async def send_otp(db: AsyncSession, email: str, purpose: str) -> OTP:
-    now = datetime.utcnow()
-
-    result = await db.execute(
-        select(OTP)
-        .filter_by(email=email, purpose=purpose)
-        .order_by(OTP.created_at.desc())
+        expires_at=now + timedelta(minutes=settings.OTP_LIFETIME_MINUTES),
     )
-    last_otp = result.scalars().first()
-
-    if last_otp:
-        cooldown_end = last_otp.created_at + timedelta(seconds=settings.RESEND_COOLDOWN_SECONDS)
-        if now < cooldown_end:
-            remaining = int((cooldown_end - now).total_seconds())
-            raise HTTPException(
-                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                detail=f"Please wait {remaining} seconds before requesting another OTP."
-            )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[OTP.email, OTP.purpose],
+        set_={
+            "otp": stmt.excluded.otp,
+            "created_at": stmt.excluded.created_at,
+            "expires_at": stmt.excluded.expires_at,
+        },
+        where=OTP.created_at <= cooldown_start,
+    ).returning(OTP)
+
+    result = await db.execute(stmt, execution_options={"populate_existing": True})
+    new_otp = result.scalar_one_or_none()
+    await db.commit()
 
-        await db.execute(
-            OTP.__table__.delete().where(OTP.email == email, OTP.purpose == purpose)
+    if new_otp is None:
+        result = await db.execute(select(OTP.created_at).filter_by(email=email, purpose=purpose))
+        last_created_at = result.scalar_one_or_none() or now
+        cooldown_end = last_created_at + timedelta(seconds=settings.RESEND_COOLDOWN_SECONDS)
+        remaining = max(int((cooldown_end - now).total_seconds()), 1)
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=f"Please wait {remaining} seconds before requesting another OTP."
         )
 
-    new_otp = create_otp(email=email, purpose=purpose)
-    db.add(new_otp)
-    await db.commit()
-    return new_otp
\ No newline at end of file
+    return new_otp
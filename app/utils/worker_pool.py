@@ -0,0 +1,108 @@
+# app/utils/worker_pool.py
+import asyncio
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+from fastapi import HTTPException, status
+
+
+def _timed_call(fn, args):
+    # Runs inside the worker; time.monotonic is system-wide on Linux, so the
+    # start stamp is comparable with the one taken on the event loop.
+    started = time.monotonic()
+    return started, fn(*args)
+
+
+class BoundedWorkerPool:
+    """Runs blocking callables off the event loop with a hard cap on backlog.
+
+    At most ``max_workers`` calls run at once and at most ``max_queue`` more
+    wait for a worker; anything beyond that is rejected with a 503 instead of
+    piling up behind a saturated pool.
+    """
+
+    def __init__(self, name: str, kind: str = "thread", max_workers: int = 0, max_queue: int = 0):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown worker pool kind: {kind}")
+        self.name = name
+        self.kind = kind
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_queue = max_queue
+        self._executor: Optional[Executor] = None
+        self._pending = 0
+        self._completed = 0
+        self._rejected = 0
+        self._failed = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._run_total = 0.0
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix=f"{self.name}-pool"
+                )
+        return self._executor
+
+    async def run(self, fn, *args):
+        if self._pending >= self.max_workers + self.max_queue:
+            self._rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is busy, please retry shortly.",
+                headers={"Retry-After": "1"},
+            )
+
+        self._pending += 1
+        submitted = time.monotonic()
+        executor = self._get_executor()
+        try:
+            loop = asyncio.get_running_loop()
+            started, result = await loop.run_in_executor(executor, _timed_call, fn, args)
+        except BrokenProcessPool:
+            # A worker died (or a result could not be unpickled) and the
+            # executor refuses all further work; start a fresh one next call.
+            if self._executor is executor:
+                self._executor = None
+                executor.shutdown(wait=False)
+            self._failed += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is busy, please retry shortly.",
+                headers={"Retry-After": "1"},
+            )
+        finally:
+            self._pending -= 1
+
+        finished = time.monotonic()
+        wait = max(started - submitted, 0.0)
+        self._completed += 1
+        self._wait_total += wait
+        self._wait_max = max(self._wait_max, wait)
+        self._run_total += finished - started
+        return result
+
+    def stats(self) -> dict:
+        return {
+            "kind": self.kind,
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "in_flight": self._pending,
+            "queued": max(self._pending - self.max_workers, 0),
+            "completed": self._completed,
+            "rejected": self._rejected,
+            "failed": self._failed,
+            "wait_seconds_total": self._wait_total,
+            "wait_seconds_max": self._wait_max,
+            "run_seconds_total": self._run_total,
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
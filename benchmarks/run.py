@@ -0,0 +1,328 @@
+# benchmarks/run.py
+"""Load-test harness for the auth and user endpoints.
+
+Starts the app in-process against a scratch database (a temporary SQLite file
+by default, or any async URL such as a local Postgres), seeds users and drives
+a weighted mix of requests at a fixed concurrency through an ASGI transport:
+
+    python -m benchmarks.run --users 200 --requests 2000 --concurrency 32
+    python -m benchmarks.run --database-url postgresql+asyncpg://localhost/auth_bench
+
+For every endpoint it reports p50/p95/p99 latency, throughput and database
+queries per request, and writes the results to a JSON baseline. Passing
+``--compare`` with an earlier baseline exits non-zero when a hot path got
+slower than the tolerance allows or started issuing more queries.
+"""
+import argparse
+import asyncio
+import contextvars
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import uuid
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+
+PASSWORD = "Benchmark1!"
+DEFAULT_MIX = "profile=8,login=2,register=1,send_otp=1"
+
+# Every request runs with its own counter so concurrent requests are not mixed up.
+_query_counter = contextvars.ContextVar("benchmark_query_counter", default=None)
+
+
+def configure_environment(database_url: str, spool_dir: str) -> None:
+    # Settings are read when app.core.config is first imported, so this has to
+    # run before anything from the app is imported.
+    os.environ["ASYNC_DATABASE_URL"] = database_url
+    os.environ.setdefault("DATABASE_URL", database_url)
+    os.environ["RATE_LIMIT_ENABLED"] = "false"
+    os.environ["RESEND_COOLDOWN_SECONDS"] = "0"
+    os.environ["EMAIL_TRANSPORT"] = "spool"
+    os.environ["EMAIL_SPOOL_DIR"] = spool_dir
+    defaults = {
+        "SECRET_KEY": "benchmark-secret",
+        "ALGORITHM": "HS256",
+        "ACCESS_TOKEN_EXPIRE_MINUTES": "30",
+        "OTP_LIFETIME_MINUTES": "10",
+        "MAIL_SENDER": "bench@example.com",
+        "GOOGLE_CLIENT_ID": "benchmark",
+        "GOOGLE_CLIENT_SECRET": "benchmark",
+        "GOOGLE_REDIRECT_URI": "http://localhost/api/v1/auth/google/callback",
+    }
+    for key, value in defaults.items():
+        os.environ.setdefault(key, value)
+
+
+def parse_mix(value: str) -> dict:
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in WORKLOADS:
+            raise argparse.ArgumentTypeError(f"Unknown workload {name!r}; choose from {', '.join(WORKLOADS)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def percentile(values: list, q: float) -> float:
+    # Nearest-rank on a sorted list; good enough for thousands of samples.
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, max(0, round(q / 100 * len(values) + 0.5) - 1))
+    return values[index]
+
+
+class BenchmarkState:
+    """Seeded users, their tokens and the per-request samples."""
+
+    def __init__(self, emails: list, tokens: list, rng: random.Random):
+        self.emails = emails
+        self.tokens = tokens
+        self.rng = rng
+        self.samples = defaultdict(list)
+
+    def random_email(self) -> str:
+        return self.rng.choice(self.emails)
+
+    def random_token(self) -> str:
+        return self.rng.choice(self.tokens)
+
+
+async def workload_login(client, state):
+    return await client.post("/auth/login", data={"username": state.random_email(), "password": PASSWORD})
+
+
+async def workload_profile(client, state):
+    return await client.get("/user/profile", headers={"Authorization": f"Bearer {state.random_token()}"})
+
+
+async def workload_register(client, state):
+    email = f"bench-new-{uuid.uuid4().hex}@example.com"
+    return await client.post("/auth/register", json={"name": "Bench", "email": email, "password": PASSWORD})
+
+
+async def workload_send_otp(client, state):
+    return await client.post("/auth/request-password-reset", json={"email": state.random_email()})
+
+
+WORKLOADS = {
+    "login": workload_login,
+    "profile": workload_profile,
+    "register": workload_register,
+    "send_otp": workload_send_otp,
+}
+
+
+async def prepare_database(user_count: int):
+    from sqlalchemy import event
+
+    from app.core.security import create_access_token, hash_password
+    from app.db.base import Base
+    from app.db import models  # noqa: F401  (registers the tables)
+    from app.db.dialect import upsert_insert
+    from app.db.models.user import User
+    from app.db.session import AsyncSessionLocal, async_engine
+
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    # One bcrypt hash shared by every seeded user keeps seeding fast; login
+    # still pays the full verification cost per request.
+    hashed = hash_password(PASSWORD)
+    emails = [f"bench-{i}@example.com" for i in range(user_count)]
+    async with AsyncSessionLocal() as db:
+        insert = upsert_insert(db)
+        for start in range(0, user_count, 1000):
+            rows = [
+                {"name": "Bench", "email": email, "hashed_password": hashed, "is_verified": True}
+                for email in emails[start:start + 1000]
+            ]
+            await db.execute(insert(User).values(rows).on_conflict_do_nothing(index_elements=["email"]))
+        await db.commit()
+
+    @event.listens_for(async_engine.sync_engine, "before_cursor_execute")
+    def count_query(*_args):
+        counter = _query_counter.get()
+        if counter is not None:
+            counter[0] += 1
+
+    tokens = [create_access_token({"sub": email}) for email in emails]
+    return emails, tokens, async_engine.dialect.name
+
+
+async def drive(client, state: BenchmarkState, schedule: list, concurrency: int, record: bool) -> float:
+    queue = iter(schedule)
+
+    async def worker():
+        for name in queue:
+            counter = [0]
+            reset = _query_counter.set(counter)
+            started = time.perf_counter()
+            try:
+                response = await WORKLOADS[name](client, state)
+                status = response.status_code
+            except Exception as exc:
+                status = type(exc).__name__
+            finally:
+                elapsed = time.perf_counter() - started
+                _query_counter.reset(reset)
+            if record:
+                state.samples[name].append((elapsed, status, counter[0]))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return time.perf_counter() - started
+
+
+def summarize(samples: list, wall_seconds: float) -> dict:
+    latencies = sorted(elapsed for elapsed, _, _ in samples)
+    statuses = Counter(str(status) for _, status, _ in samples)
+    errors = sum(count for status, count in statuses.items() if not status.startswith("2"))
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "status_codes": dict(statuses),
+        "throughput_rps": len(samples) / wall_seconds if wall_seconds else 0.0,
+        "latency_ms": {
+            "mean": sum(latencies) / len(latencies) * 1000 if latencies else 0.0,
+            "p50": percentile(latencies, 50) * 1000,
+            "p95": percentile(latencies, 95) * 1000,
+            "p99": percentile(latencies, 99) * 1000,
+            "max": latencies[-1] * 1000 if latencies else 0.0,
+        },
+        "queries_per_request": sum(queries for _, _, queries in samples) / len(samples) if samples else 0.0,
+    }
+
+
+async def run_benchmark(args) -> dict:
+    import httpx
+
+    from app.core.startup import startup
+    from app.main import app
+
+    emails, tokens, dialect = await prepare_database(args.users)
+    rng = random.Random(args.seed)
+    state = BenchmarkState(emails, tokens, rng)
+    names, weights = zip(*args.mix.items())
+    warmup = rng.choices(names, weights, k=args.warmup)
+    schedule = rng.choices(names, weights, k=args.requests)
+
+    async with app.router.lifespan_context(app):
+        # Warm-up (bcrypt calibration, DB pool) runs in the background; let it
+        # finish so it does not compete with the measured requests.
+        deadline = time.monotonic() + args.ready_timeout
+        while not startup.ready:
+            if time.monotonic() > deadline:
+                raise RuntimeError(
+                    f"App not ready after {args.ready_timeout}s: {startup.status(include_error=True)}"
+                )
+            await asyncio.sleep(0.05)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+            await drive(client, state, warmup, args.concurrency, record=False)
+            wall_seconds = await drive(client, state, schedule, args.concurrency, record=True)
+
+    all_samples = [sample for samples in state.samples.values() for sample in samples]
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "config": {
+            "database": dialect,
+            "users": args.users,
+            "requests": args.requests,
+            "warmup": args.warmup,
+            "concurrency": args.concurrency,
+            "mix": args.mix,
+            "seed": args.seed,
+        },
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "wall_seconds": wall_seconds,
+        "total": summarize(all_samples, wall_seconds),
+        "endpoints": {name: summarize(samples, wall_seconds) for name, samples in sorted(state.samples.items())},
+    }
+
+
+def print_report(result: dict) -> None:
+    header = f"{'endpoint':<10} {'reqs':>6} {'errors':>6} {'rps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'q/req':>6}"
+    print(header)
+    print("-" * len(header))
+    rows = list(result["endpoints"].items()) + [("total", result["total"])]
+    for name, summary in rows:
+        latency = summary["latency_ms"]
+        print(
+            f"{name:<10} {summary['requests']:>6} {summary['errors']:>6} {summary['throughput_rps']:>8.1f} "
+            f"{latency['p50']:>8.2f} {latency['p95']:>8.2f} {latency['p99']:>8.2f} "
+            f"{summary['queries_per_request']:>6.2f}"
+        )
+
+
+def compare(result: dict, baseline: dict, tolerance: float) -> list:
+    regressions = []
+    for name, summary in result["endpoints"].items():
+        previous = baseline.get("endpoints", {}).get(name)
+        if previous is None:
+            continue
+        p95, previous_p95 = summary["latency_ms"]["p95"], previous["latency_ms"]["p95"]
+        if previous_p95 and p95 > previous_p95 * (1 + tolerance):
+            regressions.append(f"{name}: p95 {previous_p95:.2f}ms -> {p95:.2f}ms")
+        # Query counts are deterministic for a given workload, so any growth counts.
+        queries, previous_queries = summary["queries_per_request"], previous["queries_per_request"]
+        if queries > previous_queries + 0.01:
+            regressions.append(f"{name}: queries/request {previous_queries:.2f} -> {queries:.2f}")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the auth and user endpoints.")
+    parser.add_argument("--database-url", help="Async SQLAlchemy URL; defaults to a temporary SQLite file")
+    parser.add_argument("--users", type=int, default=200, help="Users to seed")
+    parser.add_argument("--requests", type=int, default=2000, help="Measured requests")
+    parser.add_argument("--warmup", type=int, default=100, help="Unmeasured requests sent first")
+    parser.add_argument("--concurrency", type=int, default=32, help="Requests in flight at once")
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX, help=f"Workload weights (default: {DEFAULT_MIX})")
+    parser.add_argument("--seed", type=int, default=1, help="Seed for the request schedule")
+    parser.add_argument("--output", default="benchmarks/baseline.json", help="Where to write the JSON results")
+    parser.add_argument("--compare", help="Baseline JSON to check the results against")
+    parser.add_argument("--ready-timeout", type=float, default=60, help="Seconds to wait for the app's warm-up")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed p95 slowdown when comparing (0.2 = 20%%)")
+    args = parser.parse_args()
+    if isinstance(args.mix, str):
+        args.mix = parse_mix(args.mix)
+    baseline = None
+    if args.compare:
+        # Read before running so --output may point at the same file.
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    with tempfile.TemporaryDirectory(prefix="auth-bench-") as scratch:
+        database_url = args.database_url or f"sqlite+aiosqlite:///{os.path.join(scratch, 'bench.sqlite')}"
+        configure_environment(database_url, os.path.join(scratch, "spool"))
+        result = asyncio.run(run_benchmark(args))
+
+    print_report(result)
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    if baseline is not None:
+        regressions = compare(result, baseline, args.tolerance)
+        if regressions:
+            print("\nRegressions against", args.compare)
+            for line in regressions:
+                print("  " + line)
+            return 1
+        print(f"\nNo regressions against {args.compare}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
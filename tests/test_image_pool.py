@@ -0,0 +1,53 @@
+# tests/test_image_pool.py
+import asyncio
+import io
+import os
+
+import pytest
+from fastapi import HTTPException
+from PIL import Image
+
+from app.utils import images
+from app.utils.worker_pool import BoundedWorkerPool
+
+
+def _crash() -> None:
+    os._exit(1)
+
+
+def _square() -> int:
+    return 7 * 7
+
+
+@pytest.fixture
+def process_pool(monkeypatch):
+    pool = BoundedWorkerPool("test-images", kind="process", max_workers=1)
+    monkeypatch.setattr(images, "image_pool", pool)
+    yield pool
+    pool.shutdown()
+
+
+def test_bad_image_then_good_image_in_process_pool(process_pool, tmp_path):
+    bad = tmp_path / "bad.png"
+    bad.write_bytes(b"\x89PNG\r\n\x1a\n" + b"not really a png")
+    good = tmp_path / "good.png"
+    buffer = io.BytesIO()
+    Image.new("RGB", (64, 64), "red").save(buffer, "PNG")
+    good.write_bytes(buffer.getvalue())
+
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(images.render_variants_async(str(bad)))
+    assert excinfo.value.status_code == 400
+
+    variants = asyncio.run(images.render_variants_async(str(good)))
+    assert variants
+    assert process_pool.stats()["failed"] == 0
+
+
+def test_process_pool_recovers_after_worker_dies(process_pool):
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(process_pool.run(_crash))
+    assert excinfo.value.status_code == 503
+
+    assert asyncio.run(process_pool.run(_square)) == 49
+    assert process_pool.stats()["failed"] == 1